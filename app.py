@@ -1,19 +1,70 @@
-from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
+from flask import Flask, Response, g, request, jsonify, url_for
 from flask_cors import CORS
+import json
+import math
+import multiprocessing
 import os
-import spacy
-import pdfplumber
-from sentence_transformers import SentenceTransformer, util
+import re
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from job_index import ExactJobIndex, build_job_index, top_k_rows
+from chunking import chunk_similarities, quantize, reduce_similarities, resume_chunks
+from job_store import JobEmbeddingStore
+from job_catalog import JobCatalog, current_version, taxonomy_key
+from resume_cache import ResumeCache
+from resume_index import ResumeIndex
+from score_cache import ScoreCache
+from upload_store import UploadStore
+from pdf_extract import ExtractionError, extract_text
+from task_queue import QueueFull, SQLiteTaskQueue, TaskQueue
+from embed_service import BatchingEmbedder
+from embedding_backends import load_embedder
+from experience import ExperienceExtractor, format_experience, load_ner
+from metrics import Metrics
 
 app = Flask(__name__)
 CORS(app) 
-UPLOAD_FOLDER = './uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Load NLP model
-nlp = spacy.load("en_core_web_sm")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+# Stage timers and counters for /metrics (METRICS=0 turns them into no-ops); SERVER_TIMING=1
+# also reports each request's stage timings in a Server-Timing response header
+metrics = Metrics(
+    enabled=os.environ.get("METRICS", "1").lower() in ("1", "true", "yes"),
+    tracing=os.environ.get("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+)
+
+# Uploads are parsed straight from memory. MAX_UPLOAD_MB limits each PDF: every request except
+# /upload/batch is capped at that (plus room for the multipart headers) and rejected with a 413
+# while it is still being received. /upload/batch may carry up to MAX_REQUEST_MB (a batch of
+# thousands of resumes); a file in it over MAX_UPLOAD_MB gets an error in its own slot. Set
+# UPLOAD_PERSIST=1 to also archive each PDF in UPLOAD_FOLDER under its SHA-256, pruned to
+# UPLOAD_RETENTION_DAYS / UPLOAD_MAX_FILES (checked at most every UPLOAD_PRUNE_SECONDS).
+MAX_UPLOAD_BYTES = int(float(os.environ.get("MAX_UPLOAD_MB", 10)) * 1024 * 1024)
+MAX_REQUEST_BYTES = int(float(os.environ.get("MAX_REQUEST_MB", 1024)) * 1024 * 1024)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 64 * 1024
+UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", './uploads')
+UPLOAD_PERSIST = os.environ.get("UPLOAD_PERSIST", "0").lower() in ("1", "true", "yes")
+UPLOAD_RETENTION_DAYS = float(os.environ["UPLOAD_RETENTION_DAYS"]) if os.environ.get("UPLOAD_RETENTION_DAYS") else 7
+UPLOAD_MAX_FILES = int(os.environ["UPLOAD_MAX_FILES"]) if os.environ.get("UPLOAD_MAX_FILES") else 1000
+upload_store = UploadStore(
+    UPLOAD_FOLDER, max_age_seconds=UPLOAD_RETENTION_DAYS * 86400, max_files=UPLOAD_MAX_FILES,
+    prune_interval=float(os.environ.get("UPLOAD_PRUNE_SECONDS", 60))
+) if UPLOAD_PERSIST else None
+
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+# EMBED_BACKEND: torch (default), onnx or onnx-int8; EMBED_MODEL_DIR loads from a local
+# directory with no network access (see embedding_backends.py --download / --export)
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "torch")
+EMBED_MODEL_DIR = os.environ.get("EMBED_MODEL_DIR")
+# Cached embeddings are only reused by the same model *and* backend
+EMBED_MODEL_ID = f"{EMBED_MODEL_NAME}:{EMBED_BACKEND}"
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", 32))
+
+# Concurrent single-resume encodes are coalesced into one forward pass: a batch closes after
+# EMBED_BATCH_WINDOW_MS or once EMBED_MAX_BATCH sentences are waiting (0 ms turns this off)
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", 5))
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", 64))
 
 # Sample job descriptions
 job_descriptions = [
@@ -23,76 +74,697 @@ job_descriptions = [
     {"title": "NLP Engineer", "description": "Text classification, named entity recognition, embeddings, and LLM fine-tuning."}
 ]
 
-# Precompute job embeddings
-job_corpus = [job["description"] for job in job_descriptions]
-job_embeddings = embedder.encode(job_corpus, convert_to_tensor=True)
-
-def parse_resume(file_path):
-    with pdfplumber.open(file_path) as pdf:
-        text = "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-    
-    lower_text = text.lower()
-
-    # Simple skill matcher
-    skills_keywords = [
-        "python", "c++", "c", "sql", "java", "opencv", "tensorflow", "rasa", "docker",
-        "matplotlib", "pandas", "scikit-learn", "gen ai", "data science", "nlp", 
-        "communication", "leadership", "team work"
-    ]
-    skills = [kw for kw in skills_keywords if kw in lower_text]
-
-    # Simple experience matcher
-    experience = []
-    if "vaisesika" in lower_text:
-        experience.append("AI Engineer at Vaisesika")
-    if "samsung" in lower_text:
-        experience.append("Intern at Samsung Prism")
-    if "drone" in lower_text:
-        experience.append("Drone Vision Project")
-    if "kpmg" in lower_text:
-        experience.append("KPMG Virtual Internship")
-
-    resume_summary = f"Skills: {', '.join(skills)}. Experience: {', '.join(experience)}."
-    return resume_summary, {"skills": skills, "experience": experience}
-
-
-def match_jobs(resume_summary, skills, top_k=3):
-    resume_embedding = embedder.encode(resume_summary, convert_to_tensor=True)
-    similarities = util.cos_sim(resume_embedding, job_embeddings)[0]
-
+# Skill taxonomy (canonical name -> synonyms) compiled once into a phrase matcher;
+# point SKILLS_TAXONOMY at a JSON file to load a larger one
+SKILLS_TAXONOMY = os.environ.get("SKILLS_TAXONOMY")
+
+# Work history is extracted with spaCy NER (only the "ner" component enabled, documents capped
+# at EXPERIENCE_MAX_CHARS characters); without EXPERIENCE_MODEL installed it falls back to patterns
+EXPERIENCE_MODEL = os.environ.get("EXPERIENCE_MODEL", "en_core_web_sm")
+EXPERIENCE_MAX_CHARS = int(os.environ.get("EXPERIENCE_MAX_CHARS", 20000))
+
+# Job embeddings live in an on-disk store keyed by description hash + model name:
+# only new or edited postings get encoded, and every worker mmaps the same file read-only
+JOB_STORE_DIR = os.environ.get("JOB_STORE_DIR", "./job_store")
+job_store = JobEmbeddingStore(JOB_STORE_DIR, EMBED_MODEL_ID)
+
+# "exact" scans every job; "ivf" (nprobe) and "hnsw" (ef_search, needs faiss) trade recall for latency
+JOB_INDEX_BACKEND = os.environ.get("JOB_INDEX_BACKEND", "exact")
+JOB_INDEX_OPTIONS = {
+    "ivf": {"nprobe": int(os.environ.get("JOB_INDEX_NPROBE", 8))},
+    "hnsw": {"ef_search": int(os.environ.get("JOB_INDEX_EF_SEARCH", 64))},
+}.get(JOB_INDEX_BACKEND, {})
+
+# The exact index scores every job; approximate ones shortlist the best semantic
+# candidates (top_k * factor) and only those are re-ranked with the skill score
+JOB_SHORTLIST_FACTOR = int(os.environ.get("JOB_SHORTLIST_FACTOR", 10))
+# Batches of resumes are scored against every job in one chunk x job matmul, split so that
+# no single product holds more than MATCH_MAX_BATCH_SCORES similarities (default 32M, 128 MB)
+MATCH_MAX_BATCH_SCORES = int(os.environ.get("MATCH_MAX_BATCH_SCORES", 2 ** 25))
+
+
+# Heavy resources load lazily: importing app.py only reads configuration, and each model
+# is built on first use. warm_up() loads everything up front; gunicorn.conf.py runs it in
+# the pre-fork master so workers share the loaded weights copy-on-write, and `python app.py`
+# runs it in the background so /healthz answers while /readyz waits for the models.
+_loaded = {}
+_load_lock = threading.RLock()
+warm_up_state = {"status": "cold", "seconds": None, "error": None}
+
+
+def _load(name, factory):
+    value = _loaded.get(name)
+    if value is None:
+        with _load_lock:
+            value = _loaded.get(name)
+            if value is None:
+                value = _loaded[name] = factory()
+    return value
+
+
+def get_embedder():
+    def build():
+        embedder = load_embedder(EMBED_BACKEND, EMBED_MODEL_DIR or EMBED_MODEL_NAME)
+        if EMBED_BATCH_WINDOW_MS > 0:
+            embedder = BatchingEmbedder(embedder, max_batch_size=EMBED_MAX_BATCH, max_wait_ms=EMBED_BATCH_WINDOW_MS)
+        return embedder
+    return _load("embedder", build)
+
+
+def get_skill_extractor():
+    def build():
+        # The skill matcher only needs spaCy's English tokenizer and vocab, not a trained pipeline
+        import spacy
+        from skills import DEFAULT_SKILLS_TAXONOMY, SkillExtractor, load_taxonomy
+        taxonomy = load_taxonomy(SKILLS_TAXONOMY) if SKILLS_TAXONOMY else DEFAULT_SKILLS_TAXONOMY
+        return SkillExtractor(spacy.blank("en"), taxonomy)
+    return _load("skill_extractor", build)
+
+
+def get_experience_extractor():
+    return _load(
+        "experience_extractor",
+        lambda: ExperienceExtractor(load_ner(EXPERIENCE_MODEL), max_chars=EXPERIENCE_MAX_CHARS)
+    )
+
+
+# With JOB_CATALOG_DIR set, jobs come from the catalog built by `python job_catalog.py`
+# instead of job_descriptions. Every JOB_CATALOG_POLL_SECONDS the server checks for a newly
+# published version and swaps it in without a restart; requests keep the version they started with.
+JOB_CATALOG_DIR = os.environ.get("JOB_CATALOG_DIR")
+JOB_CATALOG_POLL_SECONDS = float(os.environ.get("JOB_CATALOG_POLL_SECONDS", 5))
+_catalog_reload_lock = threading.Lock()
+_catalog_checked_at = 0.0
+
+
+def _build_job_catalog():
+    skill_extractor = get_skill_extractor()
+    if JOB_CATALOG_DIR and current_version(JOB_CATALOG_DIR):
+        catalog = JobCatalog.open_current(JOB_CATALOG_DIR)
+        if catalog.model != EMBED_MODEL_ID:
+            raise ValueError(f"Job catalog {catalog.version} was encoded with {catalog.model}, not {EMBED_MODEL_ID}")
+        embeddings = catalog.embeddings
+        titles = catalog.titles()
+        if catalog.manifest.get("taxonomy") == taxonomy_key(skill_extractor.taxonomy):
+            skill_lists = catalog.skill_lists()
+        else:
+            skill_lists = skill_extractor.extract_many(catalog.descriptions())
+        version = catalog.version
+    else:
+        embedder = get_embedder()
+        job_corpus = [job["description"] for job in job_descriptions]
+        embeddings = job_store.sync(
+            job_corpus,
+            lambda texts: embedder.encode(texts, batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True)
+        )
+        titles = [job["title"] for job in job_descriptions]
+        skill_lists = skill_extractor.extract_many(job_corpus)
+        version = None
+    return {
+        "version": version,
+        "titles": titles,
+        "embeddings": embeddings,
+        "index": build_job_index(embeddings, JOB_INDEX_BACKEND, normalized=True, **JOB_INDEX_OPTIONS),
+        # Each job's skills are extracted once, with the same engine used for resumes, into a
+        # sparse job x skill matrix so skill overlap for many jobs is one mat-vec
+        "skill_matrix": skill_extractor.skill_matrix(skill_lists),
+    }
+
+
+def get_job_catalog():
+    catalog = _load("job_catalog", _build_job_catalog)
+    if JOB_CATALOG_DIR:
+        _maybe_reload_job_catalog(catalog)
+        catalog = _loaded["job_catalog"]
+    return catalog
+
+
+def _maybe_reload_job_catalog(catalog):
+    global _catalog_checked_at
+    now = time.monotonic()
+    if now - _catalog_checked_at < JOB_CATALOG_POLL_SECONDS:
+        return
+    # At most one rebuild at a time; the lock is held until the background build finishes
+    if not _catalog_reload_lock.acquire(blocking=False):
+        return
+    started = False
+    try:
+        _catalog_checked_at = now
+        if current_version(JOB_CATALOG_DIR) != catalog["version"]:
+            # Loading and indexing a catalog can take seconds, so it happens off the request
+            # thread; every request keeps the current catalog until the new one is swapped in
+            threading.Thread(target=_reload_job_catalog, args=(catalog["version"],),
+                             name="job-catalog-reload", daemon=True).start()
+            started = True
+    finally:
+        if not started:
+            _catalog_reload_lock.release()
+
+
+def _reload_job_catalog(old_version):
+    try:
+        _loaded["job_catalog"] = _build_job_catalog()
+    except Exception:
+        app.logger.exception("Could not load the new job catalog, keeping %s", old_version)
+    else:
+        app.logger.info("Switched to job catalog %s", _loaded["job_catalog"]["version"])
+    finally:
+        _catalog_reload_lock.release()
+
+
+# Every analyzed resume also joins a persistent pool for job description -> resume ranking
+RESUME_INDEX_DIR = os.environ.get("RESUME_INDEX_DIR", "./resume_index")
+
+
+def get_resume_index():
+    def build():
+        dim = get_embedder().get_sentence_embedding_dimension()
+        return ResumeIndex(RESUME_INDEX_DIR, get_skill_extractor(), dim)
+    return _load("resume_index", build)
+
+
+def sync_job_store():
+    # Encodes the sample jobs missing from job_store with a freshly loaded model, no batching wrapper
+    model = load_embedder(EMBED_BACKEND, EMBED_MODEL_DIR or EMBED_MODEL_NAME)
+    job_store.sync(
+        [job["description"] for job in job_descriptions],
+        lambda texts: model.encode(texts, batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True)
+    )
+
+
+def warm_up(forward_pass=True):
+    # forward_pass=False (pre-fork master) runs no inference in this process: a cold job
+    # store is encoded in a spawned child, and get_job_catalog() then only reads the result
+    started = time.perf_counter()
+    warm_up_state["status"] = "warming"
+    try:
+        uses_job_store = not (JOB_CATALOG_DIR and current_version(JOB_CATALOG_DIR))
+        if not forward_pass and uses_job_store and not job_store.is_current([job["description"] for job in job_descriptions]):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pool.submit(sync_job_store).result()
+        get_job_catalog()  # pulls in the embedder and the skill extractor
+        get_experience_extractor()
+        if forward_pass:
+            get_embedder().encode("warm up", normalize_embeddings=True)
+    except Exception as e:
+        warm_up_state.update(status="failed", error=str(e))
+        raise
+    warm_up_state.update(status="ready", seconds=round(time.perf_counter() - started, 2))
+
+
+def start_background_warm_up():
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            app.logger.exception("Model warm-up failed")
+    threading.Thread(target=run, daemon=True).start()
+
+
+# PDF extraction limits: large documents are split across PDF_WORKERS processes, extraction
+# stops early after PDF_MAX_PAGES pages / PDF_MAX_CHARS characters, and PDF_TIMEOUT seconds
+# bounds each document so a pathological PDF can't hold a worker
+PDF_MAX_PAGES = int(os.environ["PDF_MAX_PAGES"]) if os.environ.get("PDF_MAX_PAGES") else None
+PDF_MAX_CHARS = int(os.environ["PDF_MAX_CHARS"]) if os.environ.get("PDF_MAX_CHARS") else None
+PDF_TIMEOUT = float(os.environ.get("PDF_TIMEOUT", 30)) or None
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+
+# The semantic score compares jobs with the whole resume, split into section-aware chunks of
+# CHUNK_MAX_WORDS words: "max" (default) takes each job's best-matching chunk, "mean" the mean
+# of its CHUNK_TOP_M best chunks, and "summary" the old single skills/experience summary.
+# Chunk matrices are stored as CHUNK_DTYPE (int8 or float16) to keep each resume small.
+SEMANTIC_SCORING = os.environ.get("SEMANTIC_SCORING", "max")
+CHUNK_TOP_M = int(os.environ.get("CHUNK_TOP_M", 3))
+CHUNK_MAX_WORDS = int(os.environ.get("CHUNK_MAX_WORDS", 150))
+CHUNK_OVERLAP = int(os.environ.get("CHUNK_OVERLAP", 30))
+CHUNK_DTYPE = os.environ.get("CHUNK_DTYPE", "int8")
+
+# Parsed resumes are cached by upload content; bump PARSER_VERSION whenever parsing output changes
+PARSER_VERSION = "5"
+RESUME_CACHE_DIR = os.environ.get("RESUME_CACHE_DIR", "./resume_cache")
+resume_cache = ResumeCache(
+    RESUME_CACHE_DIR,
+    f"{PARSER_VERSION}-p{PDF_MAX_PAGES}-c{PDF_MAX_CHARS}-w{CHUNK_MAX_WORDS}-o{CHUNK_OVERLAP}-{CHUNK_DTYPE}",
+    EMBED_MODEL_ID,
+    max_items=int(os.environ.get("RESUME_CACHE_SIZE", 1024)),
+    max_disk_items=int(os.environ.get("RESUME_CACHE_DISK_ITEMS", 10000)),
+    max_age_seconds=float(os.environ.get("RESUME_CACHE_RETENTION_DAYS", 30)) * 86400,
+    prune_interval=float(os.environ.get("RESUME_CACHE_PRUNE_SECONDS", 60))
+)
+
+
+def extract_resume_text(source):
+    # source: a path, the upload's bytes or a binary file object
+    stats = {}
+    with metrics.timer("extract"):
+        text = extract_text(
+            source,
+            max_pages=PDF_MAX_PAGES,
+            max_chars=PDF_MAX_CHARS,
+            timeout=PDF_TIMEOUT,
+            workers=PDF_WORKERS,
+            stats=stats
+        )
+    metrics.inc("pdf_pages", stats.get("pages", 0))
+    metrics.inc("pdf_chars", len(text))
+    return text
+
+
+def parse_resume_text(text):
+    return parse_resume_texts([text])[0]
+
+
+def parse_resume_texts(texts):
+    # [(summary, entities)] for a batch of resume texts; NER runs over them in one nlp.pipe call
+    with metrics.timer("parse"):
+        parsed = _parse_resume_texts(texts)
+    for _, entities in parsed:
+        metrics.inc("resumes_parsed")
+        metrics.inc("skills_found", len(entities["skills"]))
+    return parsed
+
+
+def _parse_resume_texts(texts):
+    # Skill matcher: one pass over the text, word-boundary matches, synonyms mapped to canonical names
+    skill_lists = get_skill_extractor().extract_many(texts)
+    # Experience: {"title", "org", "start", "end"} records from the experience sections
+    experience_lists = get_experience_extractor().extract_many(texts)
+
+    parsed = []
+    for skills, experience in zip(skill_lists, experience_lists):
+        resume_summary = (
+            f"Skills: {', '.join(skills)}. "
+            f"Experience: {', '.join(format_experience(record) for record in experience)}."
+        )
+        parsed.append((resume_summary, {"skills": skills, "experience": experience}))
+    return parsed
+
+
+def parse_resume(source):
+    return parse_resume_text(extract_resume_text(source))
+
+
+# Job ranking: weights[0] * semantic score + weights[1] * skill score; /rescore takes other weights
+MATCH_WEIGHTS = (0.6, 0.4)
+MAX_WEIGHT = 1e6
+
+# Each analyzed resume's per-job score vectors stay in memory for /rescore (SCORE_CACHE_SIZE
+# resumes, SCORE_CACHE_TTL seconds). With an approximate job index the vectors cover the
+# SCORE_CACHE_TOP_K * JOB_SHORTLIST_FACTOR shortlist, which caps the useful /rescore top_k.
+SCORE_CACHE_TOP_K = int(os.environ.get("SCORE_CACHE_TOP_K", 50))
+score_cache = ScoreCache(
+    max_items=int(os.environ.get("SCORE_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("SCORE_CACHE_TTL", 3600))
+)
+
+
+def encode_resumes(resumes, batch_size=EMBED_BATCH_SIZE):
+    # resumes: [(text, summary)]. Every summary and chunk goes through one batched forward pass;
+    # the summary vector feeds the resume pool, the quantized chunk matrix feeds job scoring
+    chunk_lists = [resume_chunks(text, CHUNK_MAX_WORDS, CHUNK_OVERLAP) for text, _ in resumes]
+    sentences = []
+    for (_, resume_summary), chunks in zip(resumes, chunk_lists):
+        sentences += [resume_summary] + chunks
+    with metrics.timer("embed"):
+        embeddings = get_embedder().encode(sentences, batch_size=batch_size, normalize_embeddings=True)
+    metrics.inc("sentences_embedded", len(sentences))
+
+    encoded, offset = [], 0
+    for chunks in chunk_lists:
+        rows = embeddings[offset:offset + 1 + len(chunks)]
+        offset += len(rows)
+        # A resume with no extractable text falls back to its summary as the only chunk
+        chunk_matrix, chunk_scales = quantize(rows[1:] if chunks else rows, CHUNK_DTYPE)
+        encoded.append({"embedding": rows[0], "chunks": chunk_matrix, "chunk_scales": chunk_scales})
+    return encoded
+
+
+def job_score_vectors(job_ids, similarities, skills, catalog=None):
+    # Semantic and skill score of every candidate job; job_ids=None means `similarities`
+    # covers the whole catalog in job order
+    catalog = catalog or get_job_catalog()
+    job_skill_matrix = catalog["skill_matrix"]
+    similarities = np.asarray(similarities, dtype=np.float32)
+    if job_ids is None:
+        candidate_skills = job_skill_matrix
+    else:
+        job_ids = np.asarray(job_ids)
+        valid = job_ids >= 0  # approximate backends pad short result lists with -1
+        job_ids, similarities = job_ids[valid], similarities[valid]
+        candidate_skills = job_skill_matrix[job_ids]
+
+    # Skill match score: overlap with every candidate job in one sparse mat-vec
+    resume_vector = get_skill_extractor().skill_vector(skills)
+    skill_scores = (candidate_skills @ resume_vector) / max(len(skills), 1)
+    metrics.inc("jobs_scored", len(skill_scores))
+    return {
+        "version": catalog["version"],
+        "job_ids": job_ids,
+        "semantic": similarities,
+        "skill": skill_scores,
+        "skills": skills,
+    }
+
+
+def rank_jobs(scores, top_k=3, weights=MATCH_WEIGHTS, catalog=None):
+    # Weighted total score and top-k in one vectorized pass; no model calls
+    catalog = catalog or get_job_catalog()
+    job_skill_matrix = catalog["skill_matrix"]
+    skill_extractor = get_skill_extractor()
+    job_ids = scores["job_ids"]
+    similarities = scores["semantic"].astype(np.float32)
+    skill_scores = scores["skill"].astype(np.float32)
+    total_scores = weights[0] * similarities + weights[1] * skill_scores
+
+    # Only the top_k jobs get their matched skills materialized
+    resume_vector = skill_extractor.skill_vector(scores["skills"])
+    top, _ = top_k_rows(total_scores[None, :], top_k)
     results = []
-    for i, job in enumerate(job_descriptions):
-        job_title = job["title"]
-        job_desc = job["description"].lower()
+    for n in top[0]:
+        i = n if job_ids is None else job_ids[n]
+        row = job_skill_matrix.indices[job_skill_matrix.indptr[i]:job_skill_matrix.indptr[i + 1]]
+        results.append({
+            "job_title": catalog["titles"][i],
+            "semantic_score": round(float(similarities[n]), 2),
+            "skill_score": round(float(skill_scores[n]), 2),
+            "total_score": round(float(total_scores[n]), 2),
+            "matched_skills": [skill_extractor.skills[j] for j in sorted(row) if resume_vector[j]]
+        })
+    return results
 
-        # Skill match score
-        matched_skills = [skill for skill in skills if skill in job_desc]
-        skill_score = len(matched_skills) / max(len(skills), 1)
 
-        # Semantic similarity score
-        sem_score = float(similarities[i])
+def score_jobs(job_ids, similarities, skills, top_k=3, catalog=None, weights=MATCH_WEIGHTS):
+    catalog = catalog or get_job_catalog()
+    return rank_jobs(job_score_vectors(job_ids, similarities, skills, catalog), top_k, weights, catalog)
+
+
+def shortlist_jobs(resume_embeddings, top_k=3, catalog=None):
+    job_index = (catalog or get_job_catalog())["index"]
+    if isinstance(job_index, ExactJobIndex):
+        return None, job_index.similarities(resume_embeddings)
+    return job_index.search(resume_embeddings, top_k * JOB_SHORTLIST_FACTOR)
+
+
+def shortlist_jobs_by_chunks(chunks, chunk_scales, top_k=3, catalog=None):
+    catalog = catalog or get_job_catalog()
+    top_m = CHUNK_TOP_M if SEMANTIC_SCORING == "mean" else 1
+    job_ids = None
+    job_embeddings = catalog["embeddings"]
+    if not isinstance(catalog["index"], ExactJobIndex):
+        # Approximate index: shortlist per chunk, then score the union of candidates exactly
+        job_ids, _ = catalog["index"].search(chunks.astype(np.float32) * chunk_scales[:, None], top_k * JOB_SHORTLIST_FACTOR)
+        job_ids = np.unique(job_ids[job_ids >= 0])
+        job_embeddings = job_embeddings[job_ids]
+    return job_ids, reduce_similarities(chunk_similarities(chunks, chunk_scales, job_embeddings), top_m)
+
+
+def match_jobs(resume_summary, skills, top_k=3, resume_embedding=None, chunks=None, chunk_scales=None):
+    with metrics.timer("match"):
+        # One catalog snapshot for the whole match, even if a new version is swapped in meanwhile
+        catalog = get_job_catalog()
+        scores = resume_job_scores(resume_summary, skills, top_k, resume_embedding, chunks, chunk_scales, catalog)
+        return rank_jobs(scores, top_k, catalog=catalog)
+
+
+def resume_job_scores(resume_summary, skills, top_k=3, resume_embedding=None, chunks=None, chunk_scales=None,
+                      catalog=None):
+    # With an approximate index only the top_k * JOB_SHORTLIST_FACTOR shortlist gets scored
+    catalog = catalog or get_job_catalog()
+    if chunks is not None and SEMANTIC_SCORING != "summary":
+        job_ids, similarities = shortlist_jobs_by_chunks(chunks, chunk_scales, top_k, catalog)
+        return job_score_vectors(job_ids, similarities, skills, catalog)
+    if resume_embedding is None:
+        resume_embedding = get_embedder().encode(resume_summary, normalize_embeddings=True)
+    job_ids, similarities = shortlist_jobs(resume_embedding, top_k, catalog)
+    return job_score_vectors(None if job_ids is None else job_ids[0], similarities[0], skills, catalog)
+
+
+def batch_job_scores(entries, top_k=3, catalog=None):
+    # Score vectors for a batch of resume cache entries. With the exact index the chunk matrices
+    # of the whole batch are stacked and scored against the jobs in one matmul (per group of at
+    # most MATCH_MAX_BATCH_SCORES similarities), then reduced per resume by chunk offsets.
+    catalog = catalog or get_job_catalog()
+    if not entries:
+        return []
+    if SEMANTIC_SCORING == "summary":
+        # One query row per resume summary, all shortlisted together
+        job_ids, similarities = shortlist_jobs(np.stack([entry["embedding"] for entry in entries]), top_k, catalog)
+        return [
+            job_score_vectors(None if job_ids is None else job_ids[n], similarities[n], entry["entities"]["skills"], catalog)
+            for n, entry in enumerate(entries)
+        ]
+    if not isinstance(catalog["index"], ExactJobIndex):
+        # Approximate indexes shortlist each resume's chunks separately
+        return [
+            resume_job_scores(entry["summary"], entry["entities"]["skills"], top_k, entry["embedding"],
+                              entry["chunks"], entry["chunk_scales"], catalog)
+            for entry in entries
+        ]
+
+    top_m = CHUNK_TOP_M if SEMANTIC_SCORING == "mean" else 1
+    max_rows = max(MATCH_MAX_BATCH_SCORES // max(len(catalog["embeddings"]), 1), 1)
+    scores, group, rows = [], [], 0
+    for n, entry in enumerate(entries):
+        group.append(entry)
+        rows += len(entry["chunks"])
+        if n + 1 < len(entries) and rows + len(entries[n + 1]["chunks"]) <= max_rows:
+            continue
+        similarities = chunk_similarities(
+            np.concatenate([e["chunks"] for e in group]),
+            np.concatenate([e["chunk_scales"] for e in group]),
+            catalog["embeddings"]
+        )
+        offset = 0
+        for e in group:
+            reduced = reduce_similarities(similarities[offset:offset + len(e["chunks"])], top_m)
+            offset += len(e["chunks"])
+            scores.append(job_score_vectors(None, reduced, e["entities"]["skills"], catalog))
+        group, rows = [], 0
+    return scores
+
+
+def match_cached_resumes(resumes, top_k=3):
+    # Job matches for a batch of (resume_id, resume cache entry) pairs, scored together by
+    # batch_job_scores. As for a single upload, the score vectors go into score_cache so
+    # /rescore accepts every returned resume_id.
+    with metrics.timer("match"):
+        catalog = get_job_catalog()
+        batch_scores = batch_job_scores([entry for _, entry in resumes], max(top_k, SCORE_CACHE_TOP_K), catalog)
+        for (resume_id, _), scores in zip(resumes, batch_scores):
+            score_cache.put(resume_id, scores)
+        return [rank_jobs(scores, top_k, catalog=catalog) for scores in batch_scores]
+
+
+def rescore_resume(resume_id, top_k=3, weights=MATCH_WEIGHTS):
+    # Re-rank a previously analyzed resume from its cached score vectors. If they were evicted,
+    # or the job catalog changed since, they are rebuilt from the cached resume embeddings
+    # (still no model call). None if the resume itself is no longer cached.
+    with metrics.timer("rescore"):
+        catalog = get_job_catalog()
+        scores = score_cache.get(resume_id)
+        if scores is None or scores["version"] != catalog["version"]:
+            cached = resume_cache.get(resume_id)
+            if cached is None:
+                return None
+            scores = resume_job_scores(
+                cached["summary"], cached["entities"]["skills"], SCORE_CACHE_TOP_K,
+                cached["embedding"], cached["chunks"], cached["chunk_scales"], catalog
+            )
+            score_cache.put(resume_id, scores)
+        return rank_jobs(scores, top_k, weights, catalog)
+
+
+def _read_resume(source):
+    # A path or binary file object as bytes
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    source.seek(0)
+    return source.read()
+
+
+def cache_parsed_resumes(parsed, batch_size=EMBED_BATCH_SIZE):
+    # parsed: [(resume_id, text, summary, entities)]. One batched forward pass for every summary
+    # and chunk, then each resume goes into resume_cache under its id; returns the entries
+    encoded = encode_resumes([(text, resume_summary) for _, text, resume_summary, _ in parsed], batch_size)
+    entries = []
+    for (resume_id, text, resume_summary, entities), resume in zip(parsed, encoded):
+        entry = {"text": text, "summary": resume_summary, "entities": entities, **resume}
+        resume_cache.put(resume_id, entry)
+        entries.append(entry)
+    return entries
+
+
+def match_resumes(resumes, top_k=3, batch_size=EMBED_BATCH_SIZE, filenames=None):
+    # Cached resumes skip parsing and encoding, like a single /upload; the rest are parsed
+    # first, and a file that fails to parse only fails its own slot. Every resume also
+    # joins the resume pool.
+    results = [None] * len(resumes)
+    entries = {}
+    misses = []
+    for i, resume in enumerate(resumes):
+        try:
+            data = _read_resume(resume)
+            resume_id = resume_cache.key(data)
+            entry = resume_cache.get(resume_id)
+            if entry is None:
+                misses.append((i, resume_id, extract_resume_text(data)))
+            else:
+                entries[i] = (resume_id, entry)
+        except Exception as e:
+            results[i] = {"error": f"Could not parse resume: {e}"}
+
+    if misses:
+        parsed = [
+            (resume_id, text, resume_summary, entities)
+            for (_, resume_id, text), (resume_summary, entities)
+            in zip(misses, parse_resume_texts([text for _, _, text in misses]))
+        ]
+        for (i, resume_id, _), entry in zip(misses, cache_parsed_resumes(parsed, batch_size)):
+            entries[i] = (resume_id, entry)
+
+    if entries:
+        add_to_resume_index([
+            (resume_id, entry["embedding"], entry["entities"], filenames[i] if filenames else None)
+            for i, (resume_id, entry) in entries.items()
+        ])
+        matches = match_cached_resumes(list(entries.values()), top_k)
+        for (i, (resume_id, entry)), job_matches in zip(entries.items(), matches):
+            results[i] = {
+                "resume_id": resume_id,
+                "extracted_entities": entry["entities"],
+                "job_matches": job_matches
+            }
 
-        # Weighted total score
-        total_score = 0.6 * sem_score + 0.4 * skill_score
+    return results
 
-        results.append({
-            "job_title": job_title,
-            "semantic_score": round(sem_score, 2),
-            "skill_score": round(skill_score, 2),
-            "total_score": round(total_score, 2),
-            "matched_skills": matched_skills
-        })
 
-    # Sort by total score
-    results = sorted(results, key=lambda x: x["total_score"], reverse=True)[:top_k]
-    return results
+def add_to_resume_index(resumes):
+    # resumes: (resume_id, embedding, entities, filename) tuples, appended to the pool in one write
+    return get_resume_index().add_many([
+        (resume_id, embedding, entities["skills"], {"filename": filename, "experience": entities["experience"]})
+        for resume_id, embedding, entities, filename in resumes
+    ])
+
+
+def analyze_resume(data, filename):
+    # Resubmitted resumes hit the cache and skip PDF parsing and encoding entirely
+    cache_key = resume_cache.key(data)
+    cached = resume_cache.get(cache_key)
+    if cached is None:
+        if upload_store is not None:
+            upload_store.save(data)
+        text = extract_resume_text(data)
+        resume_summary, entities = parse_resume_text(text)
+        cached = cache_parsed_resumes([(cache_key, text, resume_summary, entities)])[0]
+
+    entities = cached["entities"]
+    add_to_resume_index([(cache_key, cached["embedding"], entities, filename)])
+    # The full score vectors are kept for /rescore; the response carries the default ranking
+    with metrics.timer("match"):
+        catalog = get_job_catalog()
+        scores = resume_job_scores(
+            cached["summary"], entities["skills"], SCORE_CACHE_TOP_K,
+            cached["embedding"], cached["chunks"], cached["chunk_scales"], catalog
+        )
+        score_cache.put(cache_key, scores)
+        matches = rank_jobs(scores, catalog=catalog)
+    return {
+        "resume_id": cache_key,
+        "extracted_entities": entities,
+        "job_matches": matches
+    }
+
+
+# Async uploads: /upload?async=1 (or UPLOAD_ASYNC=1) queues the resume and returns a task id.
+# UPLOAD_CONCURRENCY worker threads drain the queue (PDF parsing itself runs in the
+# pdf_extract process pool); beyond UPLOAD_QUEUE_SIZE waiting uploads clients get a 429.
+# Set UPLOAD_QUEUE_DB to a SQLite file to keep the queue and results across restarts.
+# Without it the queue lives in one process, so under several gunicorn workers a /result
+# poll can land on a worker that never saw the task: async uploads are refused (400) when
+# SERVER_WORKERS (set by gunicorn.conf.py) is above 1 and UPLOAD_QUEUE_DB is unset.
+UPLOAD_ASYNC = os.environ.get("UPLOAD_ASYNC", "0").lower() in ("1", "true", "yes")
+UPLOAD_QUEUE_DB = os.environ.get("UPLOAD_QUEUE_DB")
+UPLOAD_QUEUE_OPTIONS = {
+    "concurrency": int(os.environ.get("UPLOAD_CONCURRENCY", 4)),
+    "max_pending": int(os.environ.get("UPLOAD_QUEUE_SIZE", 64)),
+    "result_ttl": int(os.environ.get("UPLOAD_RESULT_TTL", 3600)),
+}
+
+
+def async_uploads_supported():
+    # Read per call: gunicorn.conf.py sets SERVER_WORKERS after a preloaded app.py is imported
+    return bool(UPLOAD_QUEUE_DB) or int(os.environ.get("SERVER_WORKERS", 1)) <= 1
+
+
+def get_upload_queue():
+    # Created on first use in the serving process: worker threads don't survive a fork
+    def build():
+        if UPLOAD_QUEUE_DB:
+            return SQLiteTaskQueue(analyze_resume, UPLOAD_QUEUE_DB, **UPLOAD_QUEUE_OPTIONS)
+        return TaskQueue(analyze_resume, **UPLOAD_QUEUE_OPTIONS)
+    return _load("upload_queue", build)
+
+
+@app.before_request
+def start_request_metrics():
+    if metrics.active:
+        g.request_started = time.perf_counter()
+        if metrics.tracing:
+            g.trace_token = metrics.start_trace()
+
 
+@app.after_request
+def finish_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe_request(endpoint, request.method, response.status_code, elapsed)
+    if metrics.tracing:
+        response.headers['Server-Timing'] = metrics.server_timing(total=elapsed)
+        metrics.end_trace(g.pop('trace_token'))
+    return response
+
+
+def _too_large_message(limit):
+    return f'Upload exceeds the {round(limit / (1024 * 1024), 2):g} MB limit'
+
+
+def _file_size(file):
+    # Size of an uploaded file without reading it (werkzeug spools large ones to disk)
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    limit = MAX_REQUEST_BYTES if request.endpoint == 'upload_resumes_batch' else MAX_UPLOAD_BYTES
+    return jsonify({'error': _too_large_message(limit)}), 413
 
 
 @app.route('/')
 def home():
     return "✅ Resume Parser + Job Matcher API is running."
 
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process is up and serving, models may still be loading
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz')
+def readyz():
+    # Readiness: models and the job catalog are loaded, requests won't stall on warm-up
+    ready = all(name in _loaded for name in ('embedder', 'skill_extractor', 'experience_extractor', 'job_catalog'))
+    catalog_version = _loaded['job_catalog']['version'] if 'job_catalog' in _loaded else None
+    return jsonify({'ready': ready, 'warm_up': warm_up_state, 'job_catalog': catalog_version}), 200 if ready else 503
+
+
 @app.route('/upload', methods=['POST'])
 def upload_resume():
     if 'resume' not in request.files:
@@ -101,21 +773,193 @@ def upload_resume():
     if file.filename == '':
         return jsonify({'error': 'No filename provided'}), 400
 
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(filepath)
+    if _file_size(file) > MAX_UPLOAD_BYTES:
+        return jsonify({'error': _too_large_message(MAX_UPLOAD_BYTES)}), 413
+    data = file.read()
+    run_async = request.args.get('async', str(UPLOAD_ASYNC)).lower() in ('1', 'true', 'yes')
+    if run_async and not async_uploads_supported():
+        return jsonify({'error': 'Async uploads need UPLOAD_QUEUE_DB when the server runs more than one worker'}), 400
+    if run_async:
+        # Hand the upload to the worker pool and return at once; 429 tells clients to back off
+        try:
+            task_id = get_upload_queue().submit(data, file.filename)
+        except QueueFull as e:
+            return jsonify({'error': f'Upload queue is full: {e}'}), 429, {'Retry-After': '5'}
+        return jsonify({
+            'task_id': task_id,
+            'status': 'queued',
+            'result_url': url_for('get_result', task_id=task_id),
+            'stream_url': url_for('stream_result', task_id=task_id)
+        }), 202
+
+    try:
+        return jsonify(analyze_resume(data, file.filename))
+    except ExtractionError as e:
+        # Same message as a failed file in /upload/batch
+        return jsonify({'error': f'Could not parse resume: {e}'}), 422
+
+
+@app.route('/result/<task_id>')
+def get_result(task_id):
+    task = get_upload_queue().get(task_id)
+    if task is None:
+        return jsonify({'error': 'Unknown task id'}), 404
+    if task['status'] == 'done':
+        return jsonify({'status': 'done', **task['result']})
+    if task['status'] == 'error':
+        return jsonify({'status': 'error', 'error': task['error']}), 422
+    return jsonify({'status': task['status']}), 202
+
+
+@app.route('/result/<task_id>/stream')
+def stream_result(task_id):
+    if get_upload_queue().get(task_id) is None:
+        return jsonify({'error': 'Unknown task id'}), 404
+
+    # Server-sent events: one "status" event per state change, ending with the result
+    def events():
+        status = None
+        while True:
+            task = get_upload_queue().wait(task_id, status, timeout=15)
+            if task is None:
+                return
+            if task['status'] == status:
+                yield ': keep-alive\n\n'
+                continue
+            status = task['status']
+            payload = {'status': status}
+            if status == 'done':
+                payload.update(task['result'])
+            elif status == 'error':
+                payload['error'] = task['error']
+            yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+            if status in ('done', 'error'):
+                return
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_resumes_batch():
+    # Per-request override of MAX_CONTENT_LENGTH (Flask 3.1+), set before the body is read
+    request.max_content_length = MAX_REQUEST_BYTES
+    files = request.files.getlist('resumes')
+    if not files:
+        return jsonify({'error': 'No files uploaded'}), 400
+    try:
+        top_k = int(request.form.get('top_k', 3))
+        batch_size = int(request.form.get('batch_size', EMBED_BATCH_SIZE))
+    except ValueError:
+        return jsonify({'error': 'top_k and batch_size must be integers'}), 400
+    if top_k < 1 or batch_size < 1:
+        return jsonify({'error': 'top_k and batch_size must be positive'}), 400
+
+    # Oversized files fail their own slot; the rest are parsed straight from the upload streams,
+    # so same-named files in one batch can't clobber each other on disk
+    results = [None] * len(files)
+    accepted = []
+    for i, file in enumerate(files):
+        if _file_size(file) > MAX_UPLOAD_BYTES:
+            results[i] = {'error': _too_large_message(MAX_UPLOAD_BYTES)}
+        else:
+            accepted.append(i)
+    matched = match_resumes(
+        [files[i].stream for i in accepted], top_k=top_k, batch_size=batch_size,
+        filenames=[files[i].filename for i in accepted]
+    )
+    for i, result in zip(accepted, matched):
+        results[i] = result
+    for file, result in zip(files, results):
+        result['filename'] = file.filename
+
+    return jsonify({"results": results})
+
+
+@app.route('/match/resumes', methods=['POST'])
+def match_resumes_to_job():
+    # Reverse matching: rank the stored resume pool against one pasted job description
+    payload = request.get_json(silent=True) or {}
+    job_description = (payload.get('job_description') or '').strip()
+    if not job_description:
+        return jsonify({'error': 'No job_description provided'}), 400
+    try:
+        top_k = int(payload.get('top_k', 10))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    if top_k < 1:
+        return jsonify({'error': 'top_k must be positive'}), 400
+
+    jd_skills = get_skill_extractor().extract(job_description)
+    jd_embedding = get_embedder().encode(job_description, normalize_embeddings=True)
+    resume_index = get_resume_index()
+    candidates = resume_index.search(jd_embedding, jd_skills, top_k)
+    return jsonify({
+        "job_skills": jd_skills,
+        "pool_size": len(resume_index),
+        "candidates": candidates
+    })
 
-    # ✅ REPLACEMENT: Call enhanced parsing + matching quality
-    resume_summary, entities = parse_resume(filepath)
-    matches = match_jobs(resume_summary, entities["skills"])  # 🔥 improved!
 
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled (METRICS=0)'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/rescore', methods=['POST'])
+def rescore():
+    # Re-rank an analyzed resume with new weights / top_k from its cached score vectors
+    payload = request.get_json(silent=True) or {}
+    resume_id = payload.get('resume_id')
+    if not resume_id:
+        return jsonify({'error': 'No resume_id provided'}), 400
+    # Ids are resume cache keys, which also name files on disk: accept nothing else
+    if not isinstance(resume_id, str) or not re.fullmatch(r'[0-9a-f]{64}-[0-9a-f]{12}', resume_id):
+        return jsonify({'error': 'Malformed resume_id'}), 400
+    weights = payload.get('weights', {})
+    try:
+        if isinstance(weights, dict):
+            weights = (float(weights.get('semantic', MATCH_WEIGHTS[0])), float(weights.get('skill', MATCH_WEIGHTS[1])))
+        else:
+            weights = tuple(float(w) for w in weights)
+        top_k = int(payload.get('top_k', 3))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'weights must be numbers and top_k an integer'}), 400
+    # float() accepts "nan" and "inf", which would turn the scores into invalid JSON; the upper
+    # bound keeps weighted float32 scores finite too
+    if len(weights) != 2 or not all(math.isfinite(w) and 0 <= w <= MAX_WEIGHT for w in weights) or sum(weights) == 0:
+        return jsonify({'error': f'weights must be two numbers between 0 and {MAX_WEIGHT:,.0f}, not both zero'}), 400
+    if top_k < 1:
+        return jsonify({'error': 'top_k must be positive'}), 400
+
+    matches = rescore_resume(resume_id, top_k, weights)
+    if matches is None:
+        return jsonify({'error': 'Unknown or expired resume_id, upload the resume again'}), 404
     return jsonify({
-        "extracted_entities": entities,
-        "job_matches": matches
+        'resume_id': resume_id,
+        'weights': {'semantic': weights[0], 'skill': weights[1]},
+        'job_matches': matches
     })
 
 
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify({**resume_cache.info(), 'scores': score_cache.info()})
+
+
+@app.route('/embedder/stats')
+def embedder_stats():
+    embedder = _loaded.get("embedder")
+    if not isinstance(embedder, BatchingEmbedder):
+        return jsonify({'batching': False})
+    return jsonify({'batching': True, **embedder.stats()})
+
+
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only the serving child needs the models
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_warm_up()
     app.run(debug=True)
 
 #Use the fast api
@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:5000")
+# (connect, read) seconds; the read timeout has to cover PDF_TIMEOUT on the server
+BACKEND_TIMEOUT = (
+    float(os.environ.get("BACKEND_CONNECT_TIMEOUT", 3.05)),
+    float(os.environ.get("BACKEND_READ_TIMEOUT", 60)),
+)
+BACKEND_RETRIES = int(os.environ.get("BACKEND_RETRIES", 3))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class BackendClient:
+    # HTTP client for the Flask API used by the Streamlit frontend.
+    #
+    # One pooled requests.Session keeps connections alive across calls. Connection errors
+    # and 429/502/503/504 responses are retried with exponential backoff (honouring
+    # Retry-After); read timeouts are not, so a slow parse fails after one read timeout
+    # rather than several. Retrying POSTs is safe here: /upload is content-addressed and
+    # /match/resumes and /rescore are read-only.
+
+    def __init__(self, base_url=BACKEND_URL, timeout=BACKEND_TIMEOUT, retries=BACKEND_RETRIES, pool_size=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, path, **kwargs):
+        response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def analyze_resume(self, data, filename):
+        # async=0 so the result comes back in this response even if the server defaults to async uploads
+        return self._request("POST", "/upload", params={"async": "0"},
+                             files={"resume": (filename, data, "application/pdf")})
+
+    def rescore(self, resume_id, weights, top_k=3):
+        # weights: {"semantic": float, "skill": float}
+        return self._request("POST", "/rescore", json={"resume_id": resume_id, "weights": weights, "top_k": top_k})
+
+    def match_resumes(self, job_description, top_k=10):
+        return self._request("POST", "/match/resumes", json={"job_description": job_description, "top_k": top_k})
+
+    def ready(self):
+        try:
+            return self.session.get(self.base_url + "/readyz", timeout=self.timeout).ok
+        except requests.RequestException:
+            return False
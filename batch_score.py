@@ -0,0 +1,292 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import signal
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pdf_extract import ExtractionTimeout, extract_text
+
+
+def iter_pdf_paths(inputs):
+    # Lazily yields PDF paths from directories (walked recursively) and glob patterns
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        yield os.path.join(root, name)
+        else:
+            for path in glob.iglob(item, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+
+
+class Checkpoint:
+    # SQLite tables of the content hashes already scored (done) or that failed to parse
+    # (failed), so a rerun skips both and doesn't write their rows again; with retry_failed
+    # the failed ones are tried again. Kept on disk rather than in a Python set, so memory
+    # doesn't grow with the number of files.
+
+    def __init__(self, path, readonly=False, retry_failed=False):
+        self.retry_failed = retry_failed
+        if readonly:
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+        else:
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS done (sha256 TEXT PRIMARY KEY, path TEXT, finished REAL)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS failed (sha256 TEXT PRIMARY KEY, path TEXT, finished REAL)")
+            self.db.commit()
+
+    def __contains__(self, digest):
+        query = "SELECT 1 FROM done WHERE sha256 = ?"
+        if not self.retry_failed:
+            query += " UNION ALL SELECT 1 FROM failed WHERE sha256 = ?"
+        params = (digest,) if self.retry_failed else (digest, digest)
+        return self.db.execute(query, params).fetchone() is not None
+
+    def add_many(self, items):
+        now = time.time()
+        self.db.executemany("INSERT OR REPLACE INTO done VALUES (?, ?, ?)", [(d, p, now) for d, p in items])
+        self.db.executemany("DELETE FROM failed WHERE sha256 = ?", [(d,) for d, _ in items])
+        self.db.commit()
+
+    def add_failed(self, items):
+        now = time.time()
+        self.db.executemany("INSERT OR REPLACE INTO failed VALUES (?, ?, ?)", [(d, p, now) for d, p in items])
+        self.db.commit()
+
+
+_worker_checkpoint = None
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout("Resume parsing exceeded the per-file timeout")
+
+
+def _parse_file(path, checkpoint_path, timeout=None, retry_failed=False):
+    # Runs in a pool worker: hash, skip if already done, otherwise extract text and entities
+    # within `timeout` seconds
+    global _worker_checkpoint
+    import app
+
+    if _worker_checkpoint is None:
+        _worker_checkpoint = Checkpoint(checkpoint_path, readonly=True, retry_failed=retry_failed)
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _worker_checkpoint:
+        return {"path": path, "sha256": digest, "skipped": True}
+    resume_id = app.resume_cache.key(data)
+    # Resumes already in the server's resume cache skip parsing and encoding entirely
+    cached = app.resume_cache.get(resume_id)
+    if cached is not None:
+        return {"path": path, "sha256": digest, "resume_id": resume_id, "entry": cached}
+    # One process per file already, so the deadline is a SIGALRM in this worker rather than
+    # a nested page-level pool; without SIGALRM (Windows) extract_text enforces it instead
+    alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text = extract_text(data, max_pages=app.PDF_MAX_PAGES, max_chars=app.PDF_MAX_CHARS,
+                            timeout=None if alarm else timeout, workers=1)
+        resume_summary, entities = app.parse_resume_text(text)
+    except Exception as e:
+        return {"path": path, "sha256": digest, "error": f"Could not parse resume: {e}"}
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return {"path": path, "sha256": digest, "resume_id": resume_id, "text": text, "summary": resume_summary,
+            "entities": entities}
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.f = open(path, "a", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self.f.write(json.dumps(row) + "\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+    # Parquet files can't be appended to, so `path` is a directory and each run writes its
+    # own part file, one row group per batch
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.schema = pa.schema([
+            ("path", pa.string()),
+            ("sha256", pa.string()),
+            ("resume_id", pa.string()),
+            ("skills", pa.list_(pa.string())),
+            ("experience", pa.list_(pa.struct([
+                ("title", pa.string()), ("org", pa.string()), ("start", pa.string()), ("end", pa.string()),
+            ]))),
+            ("job_matches", pa.string()),  # JSON, same shape as the /upload response
+            ("error", pa.string()),
+        ])
+        os.makedirs(path, exist_ok=True)
+        part = os.path.join(path, time.strftime("part-%Y%m%d-%H%M%S") + f"-{os.getpid()}.parquet")
+        self.writer = pq.ParquetWriter(part, self.schema)
+
+    def write(self, rows):
+        columns = {
+            "path": [row["path"] for row in rows],
+            "sha256": [row["sha256"] for row in rows],
+            "resume_id": [row.get("resume_id") for row in rows],
+            "skills": [row.get("extracted_entities", {}).get("skills") for row in rows],
+            "experience": [row.get("extracted_entities", {}).get("experience") for row in rows],
+            "job_matches": [json.dumps(row["job_matches"]) if "job_matches" in row else None for row in rows],
+            "error": [row.get("error") for row in rows],
+        }
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def score_batch(app, parsed, top_k, batch_size, add_to_pool=True):
+    # Cache misses get one batched forward pass for every summary and chunk and go into the
+    # resume cache; cache hits arrive with their entry
+    misses = [item for item in parsed if "entry" not in item]
+    fresh = app.cache_parsed_resumes(
+        [(item["resume_id"], item["text"], item["summary"], item["entities"]) for item in misses], batch_size
+    ) if misses else []
+    for item, entry in zip(misses, fresh):
+        item["entry"] = entry
+    if add_to_pool:
+        # Scored resumes join the server's resume pool (RESUME_INDEX_DIR) for /match/resumes
+        app.add_to_resume_index([
+            (item["resume_id"], item["entry"]["embedding"], item["entry"]["entities"], os.path.basename(item["path"]))
+            for item in parsed
+        ])
+    # The whole batch is scored against the jobs together
+    matches = app.match_cached_resumes([(item["resume_id"], item["entry"]) for item in parsed], top_k)
+    return [
+        {
+            "path": item["path"],
+            "sha256": item["sha256"],
+            "resume_id": item["resume_id"],
+            "extracted_entities": item["entry"]["entities"],
+            "job_matches": job_matches,
+        }
+        for item, job_matches in zip(parsed, matches)
+    ]
+
+
+def run(inputs, output, fmt, checkpoint_path, workers, batch_size, top_k, progress_every=5.0, add_to_pool=True,
+        timeout=None, retry_failed=False):
+    import app
+
+    checkpoint = Checkpoint(checkpoint_path, retry_failed=retry_failed)
+    writer = ParquetWriter(output) if fmt == "parquet" else JsonlWriter(output)
+    stats = {"scored": 0, "skipped": 0, "errors": 0}
+    started = last_report = time.perf_counter()
+    paths = iter_pdf_paths(inputs)
+    parsed, errors = [], []
+
+    def flush():
+        # Results are written before their hashes are checkpointed: a crash in between means
+        # those files are scored again on the next run, never lost. Each content hash gets
+        # one error row; copies of a failed file in the same batch are dropped.
+        unique_errors = list({item["sha256"]: item for item in errors}.values())
+        rows = (score_batch(app, parsed, top_k, batch_size, add_to_pool) if parsed else []) + unique_errors
+        if rows:
+            writer.write(rows)
+        checkpoint.add_many([(item["sha256"], item["path"]) for item in parsed])
+        checkpoint.add_failed([(item["sha256"], item["path"]) for item in unique_errors])
+        stats["scored"] += len(parsed)
+        parsed.clear()
+        errors.clear()
+
+    # The pool is forked before the embedder is loaded, so workers stay small. At most
+    # workers * 2 files are in flight, which bounds memory however many files there are.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(_parse_file, path, checkpoint_path, timeout, retry_failed))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.get("skipped"):
+                    stats["skipped"] += 1
+                elif "error" in result:
+                    stats["errors"] += 1
+                    errors.append(result)
+                else:
+                    parsed.append(result)
+            if len(parsed) >= batch_size or len(errors) >= batch_size:
+                flush()
+
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                last_report = now
+                elapsed = now - started
+                print(json.dumps({**stats, "seconds": round(elapsed, 1),
+                                  "files_per_second": round(sum(stats.values()) / elapsed, 2)}), file=sys.stderr)
+        flush()
+
+    writer.close()
+    elapsed = time.perf_counter() - started
+    return {**stats, "seconds": round(elapsed, 2), "files_per_second": round(sum(stats.values()) / elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory or glob of resume PDFs against the job catalog")
+    parser.add_argument("inputs", nargs="+", help="directories (searched recursively for .pdf) or glob patterns")
+    parser.add_argument("--output", required=True, help="JSONL file, or a directory for --format parquet")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), help="default: parquet if --output ends in .parquet")
+    parser.add_argument("--checkpoint", help="SQLite file of finished hashes (default: <output>.checkpoint.db)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF parsing processes")
+    parser.add_argument("--batch-size", type=int, default=32, help="resumes per embedding batch")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--timeout", type=float, help="seconds per file before it fails (default: PDF_TIMEOUT)")
+    parser.add_argument("--retry-failed", action="store_true", help="retry files that failed on an earlier run")
+    parser.add_argument("--no-resume-pool", action="store_true",
+                        help="don't add scored resumes to the resume pool used by /match/resumes")
+    args = parser.parse_args()
+
+    import app
+    fmt = args.format or ("parquet" if args.output.rstrip("/").endswith(".parquet") else "jsonl")
+    stats = run(
+        args.inputs,
+        args.output,
+        fmt,
+        args.checkpoint or args.output.rstrip("/") + ".checkpoint.db",
+        args.workers,
+        args.batch_size,
+        args.top_k,
+        add_to_pool=not args.no_resume_pool,
+        timeout=args.timeout if args.timeout is not None else app.PDF_TIMEOUT,
+        retry_failed=args.retry_failed,
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
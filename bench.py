@@ -0,0 +1,254 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from embedding_backends import peak_rss_mb
+from skills import DEFAULT_SKILLS_TAXONOMY
+
+SKILL_WORDS = list(DEFAULT_SKILLS_TAXONOMY) + [s for synonyms in DEFAULT_SKILLS_TAXONOMY.values() for s in synonyms]
+FILLER_WORDS = (
+    "built deployed designed improved reduced latency pipeline models data users service api team "
+    "production scalable analysis dashboard customers accuracy training inference cloud platform"
+).split()
+COMPANIES = ["Vaisesika", "Samsung Prism", "KPMG", "Drone Vision Lab", "Acme Analytics", "Globex"]
+JOB_TITLES = ["Data Scientist", "AI Engineer", "Backend Developer", "NLP Engineer", "ML Engineer", "Data Analyst"]
+JOB_VERBS = ["Build", "Design", "Maintain", "Deploy", "Analyze", "Train", "Own"]
+
+
+def make_pdf(pages):
+    # Minimal single-font PDF: `pages` is a list of pages, each a list of text lines
+    fonts = 3 + 2 * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages))).encode(),
+    ]
+    for i, lines in enumerate(pages):
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        body = "BT /F1 11 Tf 14 TL 50 750 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {fonts} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        ).encode())
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def _sentence(rng, n_words):
+    return " ".join(rng.choice(SKILL_WORDS) if rng.random() < 0.25 else rng.choice(FILLER_WORDS) for _ in range(n_words))
+
+
+def make_resume_lines(rng, n_pages=2, name=None, lines_per_page=45):
+    # Resume-shaped text lines: section headings, skills, dated roles and bullet-point prose
+    lines = [name or f"Candidate {rng.randrange(10 ** 6)}", "Summary", _sentence(rng, 14), "Skills",
+             ", ".join(rng.sample(SKILL_WORDS, 8)), "Experience"]
+    while len(lines) < n_pages * lines_per_page:
+        lines.append(f"{rng.choice(JOB_TITLES)} at {rng.choice(COMPANIES)}, {rng.randrange(2015, 2024)} - present")
+        lines += [_sentence(rng, 14) for _ in range(rng.randrange(2, 6))]
+        if rng.random() < 0.1:
+            lines.append(rng.choice(["Projects", "Education", "Certifications"]))
+    return lines[:n_pages * lines_per_page]
+
+
+def make_resume_pdf(rng, n_pages=2, name=None, lines_per_page=45):
+    lines = make_resume_lines(rng, n_pages, name, lines_per_page)
+    return make_pdf([lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)])
+
+
+def make_job_catalog(n_jobs, rng):
+    return [
+        {
+            "title": f"{rng.choice(JOB_TITLES)} #{i}",
+            "description": f"{rng.choice(JOB_VERBS)} {_sentence(rng, 6)} with {', '.join(rng.sample(SKILL_WORDS, 3))}.",
+        }
+        for i in range(n_jobs)
+    ]
+
+
+class StubEmbedder:
+    # Offline stand-in for the sentence embedder: hashed bag of words, L2-normalized.
+    # Deterministic and cheap, so the benchmark measures everything except the model.
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, convert_to_tensor=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                h = zlib.crc32(token.encode("utf-8"))
+                embeddings[row, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+def reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM, so each stage reports its own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def measure(fn, inputs, warmup=2):
+    for item in inputs[:warmup]:
+        fn(item)
+    reset_peak_rss()
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs[warmup:]:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    ms = np.array(latencies) * 1000
+    return {
+        "n": len(latencies),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "throughput_per_s": round(len(latencies) / wall, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(args):
+    # app.py reads its configuration at import time: point every store at a scratch directory
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    for name in ("JOB_STORE_DIR", "RESUME_CACHE_DIR", "RESUME_INDEX_DIR", "UPLOAD_FOLDER"):
+        os.environ[name] = os.path.join(workdir, name.lower())
+    os.environ.setdefault("EMBED_BATCH_WINDOW_MS", "0")
+    os.environ.setdefault("MAX_UPLOAD_MB", "100")
+    import app
+
+    rng = random.Random(args.seed)
+    app.job_descriptions[:] = make_job_catalog(args.jobs, rng)
+    if args.embedder == "stub":
+        app._loaded["embedder"] = StubEmbedder(args.dim)
+
+    report = {
+        "config": {**vars(args), "commit": _git_commit(), "python": platform.python_version(),
+                   "numpy": np.__version__, "cpus": os.cpu_count(), "embed_backend": app.EMBED_BACKEND,
+                   "job_index": app.JOB_INDEX_BACKEND, "semantic_scoring": app.SEMANTIC_SCORING},
+        "setup": {},
+        "stages": {},
+    }
+    reset_peak_rss()
+    started = time.perf_counter()
+    app.warm_up()
+    report["setup"] = {"warm_up_seconds": round(time.perf_counter() - started, 3), "peak_rss_mb": peak_rss_mb()}
+
+    # Every input is a distinct resume so the content cache never short-circuits a stage
+    n = args.iterations + args.warmup
+    pdfs = [make_resume_pdf(rng, args.pages) for _ in range(n)]
+    texts = [app.extract_resume_text(pdf) for pdf in pdfs]
+    parsed = [app.parse_resume_text(text) for text in texts]
+    encoded = app.encode_resumes([(text, summary) for text, (summary, _) in zip(texts, parsed)])
+    stages = report["stages"]
+
+    stages["extract"] = measure(app.extract_resume_text, pdfs, args.warmup)
+    stages["parse"] = measure(app.parse_resume, pdfs, args.warmup)
+    stages["embed"] = measure(
+        lambda i: app.encode_resumes([(texts[i], parsed[i][0])]), list(range(n)), args.warmup
+    )
+    stages["match"] = measure(
+        lambda i: app.match_jobs(parsed[i][0], parsed[i][1]["skills"], args.top_k, encoded[i]["embedding"],
+                                 encoded[i]["chunks"], encoded[i]["chunk_scales"]),
+        list(range(n)), args.warmup
+    )
+    fresh = [make_resume_pdf(rng, args.pages) for _ in range(n)]
+    stages["end_to_end"] = measure(lambda pdf: app.analyze_resume(pdf, "resume.pdf"), fresh, args.warmup)
+
+    client = app.app.test_client()
+    fresh = [make_resume_pdf(rng, args.pages) for _ in range(n)]
+
+    def upload(pdf):
+        response = client.post("/upload", data={"resume": (io.BytesIO(pdf), "resume.pdf")})
+        if response.status_code != 200:
+            raise RuntimeError(f"/upload returned {response.status_code}: {response.get_data(as_text=True)}")
+    stages["upload"] = measure(upload, fresh, args.warmup)
+    return report
+
+
+def compare(old_path, new_path):
+    # Per stage: new / old ratio of each latency percentile and of throughput
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["stages"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["stages"]
+    return {
+        stage: {
+            metric: round(new[stage][metric] / old[stage][metric], 3)
+            if old[stage][metric] and new[stage][metric] is not None else None
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "peak_rss_mb")
+        }
+        for stage in old if stage in new
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parse -> embed -> match pipeline and /upload")
+    parser.add_argument("--jobs", type=int, default=1000, help="synthetic job catalog size (1 to 1,000,000)")
+    parser.add_argument("--iterations", type=int, default=50, help="measured calls per stage")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured calls per stage")
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--embedder", choices=("stub", "model"), default="stub",
+                        help="stub: offline hashed embedder; model: the configured EMBED_BACKEND / EMBED_MODEL_DIR")
+    parser.add_argument("--dim", type=int, default=384, help="stub embedding dimension")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        return
+    if not 1 <= args.jobs <= 1_000_000:
+        parser.error("--jobs must be between 1 and 1,000,000")
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
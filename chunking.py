@@ -0,0 +1,69 @@
+import re
+
+import numpy as np
+
+SECTION_NAMES = (
+    "summary", "profile", "objective", "skills", "technical skills", "experience", "work experience",
+    "professional experience", "employment", "internships", "projects", "education", "certifications",
+    "achievements", "awards", "publications", "languages", "interests",
+)
+# A heading is a short line holding just a section name, optionally followed by a colon
+SECTION_HEADING = re.compile(r"^\s*(%s)\s*:?\s*$" % "|".join(re.escape(n) for n in SECTION_NAMES), re.IGNORECASE)
+
+
+def split_sections(text):
+    # [(section name, body)], with anything before the first heading under "header"
+    sections = []
+    name, lines = "header", []
+    for line in text.splitlines():
+        match = SECTION_HEADING.match(line)
+        if match:
+            if any(l.strip() for l in lines):
+                sections.append((name, "\n".join(lines).strip()))
+            name, lines = match.group(1).lower(), []
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((name, "\n".join(lines).strip()))
+    return sections
+
+
+def chunk_text(text, max_words=150, overlap=30):
+    # Overlapping word windows; 150 words stays under MiniLM's 256-token limit for typical English
+    words = text.split()
+    if len(words) <= max_words:
+        return [" ".join(words)] if words else []
+    step = max_words - overlap
+    return [" ".join(words[start:start + max_words]) for start in range(0, len(words) - overlap, step)]
+
+
+def resume_chunks(text, max_words=150, overlap=30, max_chunks=32):
+    # Section-aware chunks, each prefixed with its section name so the embedding keeps that context.
+    # Capped at max_chunks so memory per resume stays bounded however long the document is.
+    chunks = []
+    for name, body in split_sections(text):
+        prefix = "" if name == "header" else f"{name.title()}: "
+        chunks.extend(prefix + chunk for chunk in chunk_text(body, max_words, overlap))
+    return chunks[:max_chunks]
+
+
+def quantize(embeddings, dtype="int8"):
+    # Compact storage for chunk matrices: float16, or int8 with one float32 scale per row
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == "float16":
+        return embeddings.astype(np.float16), np.ones(len(embeddings), dtype=np.float32)
+    scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127
+    return np.round(embeddings / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def chunk_similarities(chunks, scales, job_embeddings):
+    # (n_chunks x n_jobs) cosine similarities straight from the quantized chunk matrix
+    return (chunks.astype(np.float32) @ np.asarray(job_embeddings, dtype=np.float32).T) * scales[:, None]
+
+
+def reduce_similarities(similarities, top_m=1):
+    # Per job: the best chunk (top_m=1, max-sim) or the mean of the top_m best chunks
+    top_m = min(top_m, len(similarities))
+    if top_m <= 1:
+        return similarities.max(axis=0)
+    return np.partition(similarities, len(similarities) - top_m, axis=0)[-top_m:].mean(axis=0)
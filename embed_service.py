@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchingEmbedder:
+    # Coalesces concurrent encode() calls into one batched forward pass.
+    #
+    # Each call is queued; a single worker thread collects calls for up to `max_wait_ms`
+    # after the first one arrives, or until `max_batch_size` sentences are waiting, runs
+    # them through the model together and hands every caller back its own rows. Calls
+    # that are already a full batch on their own skip the queue. Drop-in for the
+    # SentenceTransformer.encode arguments this repo uses.
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=5):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._batch_sizes = dict.fromkeys(self.BATCH_SIZE_BUCKETS + (float("inf"),), 0)
+        self._stats = {"requests": 0, "batches": 0, "sentences": 0, "queue_wait_seconds": 0.0, "max_queue_wait_seconds": 0.0}
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Threads don't survive fork(): a pre-fork server that built this object in the
+        # master gets a fresh queue and worker thread in each child on first use
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                    threading.Thread(target=self._work, args=(self._queue,), daemon=True).start()
+                    self._pid = os.getpid()
+
+    def encode(self, sentences, batch_size=None, normalize_embeddings=False, convert_to_tensor=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if len(texts) >= self.max_batch_size or kwargs:
+            embeddings = self.model.encode(
+                texts, batch_size=batch_size or self.max_batch_size, normalize_embeddings=normalize_embeddings, **kwargs
+            )
+        elif not texts:
+            embeddings = np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        else:
+            self._ensure_worker()
+            future = Future()
+            self._queue.put((texts, normalize_embeddings, time.perf_counter(), future))
+            embeddings = future.result()
+
+        embeddings = embeddings[0] if single else embeddings
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(np.ascontiguousarray(embeddings))
+        return embeddings
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["mean_batch_size"] = round(stats["sentences"] / stats["batches"], 2) if stats["batches"] else 0.0
+            stats["mean_queue_wait_seconds"] = stats["queue_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+            # Cumulative counts: batches with at most `le` sentences
+            total = 0
+            stats["batch_size_histogram"] = []
+            for le, count in self._batch_sizes.items():
+                total += count
+                stats["batch_size_histogram"].append({"le": le if le != float("inf") else "+Inf", "count": total})
+        return stats
+
+    def _collect(self, requests):
+        batch = [requests.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _work(self, requests):
+        while True:
+            batch = self._collect(requests)
+            started = time.perf_counter()
+            # Calls asking for normalized and raw vectors can't share a forward pass
+            for normalize in {item[1] for item in batch}:
+                group = [item for item in batch if item[1] == normalize]
+                texts = [text for item in group for text in item[0]]
+                try:
+                    embeddings = self.model.encode(texts, batch_size=len(texts), normalize_embeddings=normalize)
+                except Exception as e:
+                    for item in group:
+                        item[3].set_exception(e)
+                    continue
+                offset = 0
+                for item_texts, _, _, future in group:
+                    future.set_result(embeddings[offset:offset + len(item_texts)])
+                    offset += len(item_texts)
+                self._record(group, len(texts), started)
+
+    def _record(self, group, size, started):
+        with self._lock:
+            self._stats["requests"] += len(group)
+            self._stats["batches"] += 1
+            self._stats["sentences"] += size
+            for _, _, enqueued, _ in group:
+                wait = started - enqueued
+                self._stats["queue_wait_seconds"] += wait
+                self._stats["max_queue_wait_seconds"] = max(self._stats["max_queue_wait_seconds"], wait)
+            bucket = next(le for le in self._batch_sizes if size <= le)
+            self._batch_sizes[bucket] += 1
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+EMBED_BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model-int8.onnx"}
+
+PARITY_SENTENCES = [
+    "Skills: python, sql, docker, pandas. Experience: AI Engineer at Vaisesika.",
+    "Skills: c++, opencv, tensorflow. Experience: Drone Vision Project.",
+    "Skills: communication, leadership, team work. Experience: KPMG Virtual Internship.",
+    "Build ML models, analyze data, write Python scripts, deploy with Flask.",
+    "Work on deep learning, computer vision, transformers, and deploy AI models.",
+    "Design APIs, manage databases, work with Django/Flask, and cloud services.",
+    "Text classification, named entity recognition, embeddings, and LLM fine-tuning.",
+]
+
+
+def download_model(model_name, model_dir):
+    # One-off: save the SentenceTransformer to a local directory so later loads need no network
+    from sentence_transformers import SentenceTransformer
+    SentenceTransformer(model_name).save(model_dir)
+    return model_dir
+
+
+def export_onnx(model_dir, quantize=True):
+    # Export the transformer to <model_dir>/onnx/model.onnx (+ an int8 dynamically quantized copy).
+    # Needs torch and transformers once; loading the exported model afterwards needs neither.
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    onnx_dir = os.path.join(model_dir, "onnx")
+    os.makedirs(onnx_dir, exist_ok=True)
+    model = AutoModel.from_pretrained(model_dir).eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    sample = tokenizer(["hello world"], return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        os.path.join(onnx_dir, ONNX_FILES["onnx"]),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={"input_ids": axes, "attention_mask": axes, "token_type_ids": axes, "last_hidden_state": axes},
+        opset_version=17,
+    )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            os.path.join(onnx_dir, ONNX_FILES["onnx"]),
+            os.path.join(onnx_dir, ONNX_FILES["onnx-int8"]),
+            weight_type=QuantType.QInt8,
+        )
+    return onnx_dir
+
+
+class OnnxEmbedder:
+    # ONNX Runtime version of the all-MiniLM-L6-v2 SentenceTransformer: same tokenizer,
+    # mean pooling over the attention mask and L2 normalization, without importing torch.
+
+    def __init__(self, model_dir, filename=ONNX_FILES["onnx"], threads=None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        max_seq_length = 256
+        config_path = os.path.join(model_dir, "sentence_bert_config.json")
+        if os.path.exists(config_path):
+            with open(config_path, encoding="utf-8") as f:
+                max_seq_length = json.load(f).get("max_seq_length", max_seq_length)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "onnx", filename), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, convert_to_tensor=False, **kwargs):
+        # The SentenceTransformer pipeline ends in a Normalize module, so output is always unit length
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            inputs = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, self.dimension), dtype=np.float32)
+        embeddings = embeddings.astype(np.float32)[0] if single else embeddings.astype(np.float32)
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings)
+        return embeddings
+
+
+def load_embedder(backend="torch", model="all-MiniLM-L6-v2"):
+    # `model` is a hub name or a local directory; a local directory never touches the network
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {EMBED_BACKENDS}")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model, local_files_only=os.path.isdir(model))
+    if not os.path.isdir(model):
+        raise ValueError(f"The {backend} backend needs a local model directory (see --download / --export), got {model!r}")
+    if not os.path.exists(os.path.join(model, "onnx", ONNX_FILES[backend])):
+        export_onnx(model, quantize=backend == "onnx-int8")
+    return OnnxEmbedder(model, ONNX_FILES[backend])
+
+
+def parity_check(candidate, reference, sentences=PARITY_SENTENCES, tolerance=0.02):
+    # Compare the full cosine-similarity matrices the two embedders produce
+    a = candidate.encode(sentences, normalize_embeddings=True)
+    b = reference.encode(sentences, normalize_embeddings=True)
+    max_diff = float(np.abs(a @ a.T - b @ b.T).max())
+    return {"max_cosine_diff": round(max_diff, 5), "tolerance": tolerance, "ok": max_diff <= tolerance}
+
+
+def peak_rss_mb():
+    # VmHWM is this process's own high-water mark; ru_maxrss can carry over the parent's
+    # peak across fork/exec, which would blur a per-backend comparison
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def benchmark(backend, model, n_sentences=512, batch_size=32):
+    started = time.perf_counter()
+    embedder = load_embedder(backend, model)
+    load_seconds = time.perf_counter() - started
+
+    sentences = (PARITY_SENTENCES * (n_sentences // len(PARITY_SENTENCES) + 1))[:n_sentences]
+    embedder.encode(sentences[:batch_size], batch_size=batch_size)  # warm-up
+    started = time.perf_counter()
+    embedder.encode(sentences, batch_size=batch_size)
+    encode_seconds = time.perf_counter() - started
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 3),
+        "sentences_per_second": round(n_sentences / encode_seconds, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage and compare embedding backends")
+    parser.add_argument("--model-dir", required=True, help="local model directory")
+    parser.add_argument("--model-name", default="all-MiniLM-L6-v2")
+    parser.add_argument("--download", action="store_true", help="save --model-name into --model-dir")
+    parser.add_argument("--export", action="store_true", help="export ONNX and int8 models into --model-dir/onnx")
+    parser.add_argument("--check", action="store_true", help="check cosine parity of each backend against torch")
+    parser.add_argument("--bench", action="store_true", help="benchmark each backend in a fresh process")
+    parser.add_argument("--backend", choices=EMBED_BACKENDS, help="limit --check/--bench to one backend")
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--sentences", type=int, default=512)
+    args = parser.parse_args()
+    backends = [args.backend] if args.backend else list(EMBED_BACKENDS)
+
+    if args.download:
+        download_model(args.model_name, args.model_dir)
+    if args.export:
+        export_onnx(args.model_dir)
+    if args.check:
+        reference = load_embedder("torch", args.model_dir)
+        for backend in backends:
+            if backend != "torch":
+                print(json.dumps({"backend": backend, **parity_check(load_embedder(backend, args.model_dir), reference, tolerance=args.tolerance)}))
+    if args.bench:
+        if args.backend:
+            print(json.dumps(benchmark(args.backend, args.model_dir, args.sentences)))
+        else:
+            # Separate processes so load time and RSS aren't polluted by the other backends
+            for backend in backends:
+                subprocess.run([sys.executable, __file__, "--model-dir", args.model_dir, "--bench",
+                                "--backend", backend, "--sentences", str(args.sentences)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from chunking import split_sections
+
+logger = logging.getLogger(__name__)
+
+EXPERIENCE_SECTIONS = {"experience", "work experience", "professional experience", "employment", "internships"}
+ROLE_WORDS = (
+    "Engineer", "Developer", "Scientist", "Analyst", "Intern", "Internship", "Manager", "Consultant", "Architect",
+    "Researcher", "Designer", "Lead", "Specialist", "Administrator", "Associate", "Director", "Officer", "Trainee",
+    "Programmer", "Technician", "Assistant", "Fellow",
+)
+# A role title: up to four capitalized words (or acronyms like "AI", "ML") ending in a role word
+TITLE = re.compile(r"(?:(?:[A-Z][\w+#./&-]*|of|and|&)\s+){0,4}(?:%s)s?\b" % "|".join(ROLE_WORDS))
+AT_ORG = re.compile(r"\b(?:at|@)\s+([A-Z][\w&.'-]*(?:\s+(?:[A-Z][\w&.'-]*|of|and|&))*)")
+MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+DATE = r"(?:(?P<{0}m>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|(?P<{0}n>0?[1-9]|1[0-2])/)?(?P<{0}y>(?:19|20)\d{{2}})"
+DATE_RANGE = re.compile(
+    DATE.format("s") + r"(?:\s*(?:-|–|—|to|until)\s*(?:" + DATE.format("e") + r"|(?P<present>present|current|now|today)))?",
+    re.IGNORECASE,
+)
+# Title lines are short; long lines are prose and only searched for an organisation or dates
+MAX_TITLE_LINE = 120
+
+
+def load_ner(model="en_core_web_sm"):
+    # Load the spaCy pipeline with everything except NER (and whatever NER listens to)
+    # disabled. Without the model installed, a blank pipeline still finds titles and dates.
+    import spacy
+    try:
+        nlp = spacy.load(model)
+    except OSError:
+        logger.warning("spaCy model %r is not installed (python -m spacy download %s); "
+                       "experience extraction runs without NER", model, model)
+        return spacy.blank("en")
+    keep = {"ner"}
+    for name, pipe in nlp.pipeline:
+        if "ner" in getattr(pipe, "listening_components", ()):
+            keep.add(name)
+    nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in keep])
+    return nlp
+
+
+def _date(match, prefix):
+    year = match.group(prefix + "y")
+    if year is None:
+        return None
+    month = match.group(prefix + "m")
+    month = MONTHS[month[:3].lower()] if month else match.group(prefix + "n")
+    return f"{year}-{int(month):02d}" if month else year
+
+
+def parse_date_range(text):
+    # First "2019 - 2022" / "Jan 2019 – Present" / "03/2018" in `text` as (start, end);
+    # end is "present" for ongoing roles and equals start for a single date
+    match = DATE_RANGE.search(text)
+    if match is None:
+        return None, None
+    start = _date(match, "s")
+    if match.group("present"):
+        return start, "present"
+    return start, _date(match, "e") or start
+
+
+def format_experience(record):
+    # "AI Engineer at Vaisesika (2019-present)"
+    text = record["title"] + (f" at {record['org']}" if record.get("org") else "")
+    if record.get("start"):
+        end = record.get("end")
+        text += f" ({record['start']}-{end})" if end and end != record["start"] else f" ({record['start']})"
+    return text
+
+
+class ExperienceExtractor:
+    # Structured work history: {"title", "org", "start", "end"} records.
+    #
+    # Titles come from a role-title pattern, organisations from NER ORG entities (or an
+    # "at <Org>" pattern when the model has none), dates from NER DATE spans parsed into
+    # "YYYY" / "YYYY-MM". A record collects the organisation and dates found on its title
+    # line or the two lines after it. Only the experience sections are run through the
+    # pipeline when the resume has them, capped at `max_chars` characters per document.
+
+    def __init__(self, nlp, max_chars=20000, batch_size=32, n_process=1):
+        self.nlp = nlp
+        self.max_chars = max_chars
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    def _scope(self, text):
+        sections = [body for name, body in split_sections(text) if name in EXPERIENCE_SECTIONS]
+        return ("\n".join(sections) if sections else text)[:self.max_chars]
+
+    def extract(self, text):
+        return self.extract_many([text], n_process=1)[0]
+
+    def extract_many(self, texts, n_process=None):
+        docs = self.nlp.pipe(
+            (self._scope(text) for text in texts),
+            batch_size=self.batch_size,
+            n_process=n_process or self.n_process,
+        )
+        return [self._records(doc) for doc in docs]
+
+    def _records(self, doc):
+        records = []
+        current, lines_since = None, 0
+        ents, next_ent = doc.ents, 0
+        offset = 0
+        for line in doc.text.split("\n"):
+            line_start, offset = offset, offset + len(line) + 1
+            # Entities are in document order: walk them alongside the lines
+            first_ent = next_ent
+            while next_ent < len(ents) and ents[next_ent].start_char < offset:
+                next_ent += 1
+            title = TITLE.search(line) if len(line) <= MAX_TITLE_LINE else None
+            if title:
+                current = {"title": " ".join(title.group().split()), "org": None, "start": None, "end": None}
+                records.append(current)
+                lines_since = 0
+                taken = (line_start + title.start(), line_start + title.end())
+            elif current is None or lines_since >= 2:
+                continue
+            else:
+                lines_since += 1
+                taken = (0, 0)
+
+            line_ents = [ent for ent in ents[first_ent:next_ent] if not taken[0] <= ent.start_char < taken[1]]
+            if current["org"] is None:
+                orgs = [ent.text for ent in line_ents if ent.label_ == "ORG"]
+                if not orgs:
+                    at_org = AT_ORG.search(line, title.end() if title else 0)
+                    orgs = [at_org.group(1)] if at_org else []
+                if orgs:
+                    current["org"] = orgs[0].strip(" ,.;|")
+            if current["start"] is None:
+                # Parse from the first DATE entity on, so "Jan 2019 – Present" keeps its open end
+                # even when NER only tags "Jan 2019"; without one, from the start of the line
+                dates = [ent.start_char - line_start for ent in line_ents if ent.label_ == "DATE"]
+                current["start"], current["end"] = parse_date_range(line[dates[0] if dates else 0:])
+        return records
+
+
+def benchmark(extractor, texts, n_process=1):
+    started = time.perf_counter()
+    records = extractor.extract_many(texts, n_process=n_process)
+    seconds = time.perf_counter() - started
+    return {
+        "docs": len(texts),
+        "n_process": n_process,
+        "batch_size": extractor.batch_size,
+        "docs_per_second": round(len(texts) / seconds, 1),
+        "records_per_doc": round(sum(map(len, records)) / max(len(texts), 1), 2),
+        "pipeline": extractor.nlp.pipe_names,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract experience records, or benchmark extraction throughput")
+    parser.add_argument("files", nargs="*", help="text files to extract from (one resume each)")
+    parser.add_argument("--model", default=os.environ.get("EXPERIENCE_MODEL", "en_core_web_sm"))
+    parser.add_argument("--bench", action="store_true", help="measure docs/sec on synthetic resumes")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-chars", type=int, default=20000)
+    args = parser.parse_args()
+
+    extractor = ExperienceExtractor(load_ner(args.model), max_chars=args.max_chars, batch_size=args.batch_size)
+    if args.bench:
+        import random
+        from bench import make_resume_lines
+        rng = random.Random(0)
+        texts = ["\n".join(make_resume_lines(rng, 2)) for _ in range(args.docs)]
+        for n_process in dict.fromkeys(args.n_process):
+            print(json.dumps(benchmark(extractor, texts, n_process)))
+        return
+    texts = []
+    for path in args.files or ["-"]:
+        with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+            texts.append(f.read())
+    for path, records in zip(args.files or ["-"], extractor.extract_many(texts)):
+        print(json.dumps({"file": path, "experience": records}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# With PRELOAD_MODELS=1 (default) app.py is imported once in the master and the models are
+# loaded there before forking, so every worker shares the same weights copy-on-write and
+# starts ready. With PRELOAD_MODELS=0 each worker imports app.py on its own and warms up in
+# the background, serving /healthz straight away and /readyz once its models are loaded.
+preload_app = os.environ.get("PRELOAD_MODELS", "1") == "1"
+
+
+def on_starting(server):
+    # Runs in the master before any worker forks, so every worker inherits the final worker
+    # count (including a -w override); app.py refuses async uploads it could lose track of
+    os.environ["SERVER_WORKERS"] = str(server.cfg.workers)
+    if server.cfg.workers > 1 and not os.environ.get("UPLOAD_QUEUE_DB"):
+        server.log.warning(
+            "%d workers without UPLOAD_QUEUE_DB: the upload queue is per worker, so async "
+            "uploads are refused; set UPLOAD_QUEUE_DB to share one queue", server.cfg.workers)
+
+
+def when_ready(server):
+    if preload_app:
+        import app
+        # No inference in the master: torch's thread pool shouldn't be started before fork, so a
+        # cold job store is encoded in a spawned child and the master only loads the weights
+        app.warm_up(forward_pass=False)
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        import app
+        app.start_background_warm_up()
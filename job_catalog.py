@@ -0,0 +1,277 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from embedding_backends import peak_rss_mb
+
+CURRENT = "CURRENT"
+
+
+def posting_key(title, description):
+    # Postings are de-duplicated by content: the same title and description is one job
+    return hashlib.sha256(f"{title}\0{description}".encode("utf-8")).hexdigest()
+
+
+def taxonomy_key(taxonomy):
+    return hashlib.sha256(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _open_text(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_postings(path, title_field="title", description_field="description", fmt=None):
+    # Streams {"title", "description", "extra"} dicts from a CSV or JSON Lines file (optionally
+    # .gz) one posting at a time; rows without a description are skipped
+    fmt = fmt or ("csv" if ".csv" in os.path.basename(path) else "jsonl")
+    with _open_text(path) as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            description = (row.pop(description_field, None) or "").strip()
+            if not description:
+                continue
+            title = (row.pop(title_field, None) or "").strip()
+            yield {"title": title, "description": description, "extra": row}
+
+
+def current_version(directory):
+    try:
+        with open(os.path.join(directory, CURRENT), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class JobCatalog:
+    # One published catalog version: embeddings.f32 (raw float32 rows, memory-mapped) plus
+    # jobs.db, a SQLite table with one metadata row per embedding row, and catalog.json.
+
+    def __init__(self, path):
+        self.path = path
+        self.version = os.path.basename(path)
+        with open(os.path.join(path, "catalog.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.model = self.manifest["model"]
+        self.count = self.manifest["count"]
+        self.dim = self.manifest["dim"]
+        self.embeddings = np.memmap(
+            os.path.join(path, "embeddings.f32"), dtype=np.float32, mode="r", shape=(self.count, self.dim)
+        )
+
+    @classmethod
+    def open_current(cls, directory):
+        version = current_version(directory)
+        return cls(os.path.join(directory, version)) if version else None
+
+    def _rows(self, columns):
+        db = sqlite3.connect(f"file:{os.path.join(self.path, 'jobs.db')}?mode=ro", uri=True)
+        try:
+            yield from db.execute(f"SELECT {columns} FROM jobs ORDER BY position")
+        finally:
+            db.close()
+
+    def titles(self):
+        return [title for title, in self._rows("title")]
+
+    def descriptions(self):
+        return (description for description, in self._rows("description"))
+
+    def skill_lists(self):
+        return [json.loads(skills) for skills, in self._rows("skills")]
+
+    def rows_for_keys(self, keys):
+        # {key: row} for the keys this catalog already holds
+        db = sqlite3.connect(f"file:{os.path.join(self.path, 'jobs.db')}?mode=ro", uri=True)
+        try:
+            placeholders = ",".join("?" * len(keys))
+            return dict(db.execute(f"SELECT key, position FROM jobs WHERE key IN ({placeholders})", keys))
+        finally:
+            db.close()
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest(postings, directory, encode, model_name, skill_extractor=None, chunk_size=1024, keep_versions=2,
+           progress=None):
+    """Build a new catalog version from a stream of postings and publish it atomically.
+
+    Postings are consumed `chunk_size` at a time: duplicates are dropped by content hash,
+    embeddings of postings already in the current version (same model) are copied instead
+    of re-encoded, and each chunk is appended to the on-disk matrix and metadata table
+    before the next one is read, so memory stays bounded by one chunk. Servers pointed at
+    `directory` switch to the new version once CURRENT is replaced.
+    """
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    previous = JobCatalog.open_current(directory)
+    if previous is not None and previous.model != model_name:
+        previous = None
+
+    version = time.strftime("v%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+    build_path = os.path.join(directory, f".building-{version}")
+    os.makedirs(build_path)
+    db = sqlite3.connect(os.path.join(build_path, "jobs.db"))
+    # A fresh file that is only published once complete: no journal or fsync needed while building
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    db.execute("""
+        CREATE TABLE jobs (
+            position INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            skills TEXT NOT NULL,
+            extra TEXT NOT NULL
+        )
+    """)
+
+    stats = {"read": 0, "duplicates": 0, "reused": 0, "encoded": 0}
+    count, dim = 0, previous.dim if previous is not None else None
+    try:
+        with open(os.path.join(build_path, "embeddings.f32"), "wb") as matrix:
+            for chunk in _chunks(postings, chunk_size):
+                stats["read"] += len(chunk)
+                unique = {}
+                for posting in chunk:
+                    unique.setdefault(posting_key(posting["title"], posting["description"]), posting)
+                keys = list(unique)
+                placeholders = ",".join("?" * len(keys))
+                seen = {key for key, in db.execute(f"SELECT key FROM jobs WHERE key IN ({placeholders})", keys)}
+                keys = [key for key in keys if key not in seen]
+                stats["duplicates"] += len(chunk) - len(keys)
+                if not keys:
+                    continue
+
+                reusable = previous.rows_for_keys(keys) if previous is not None else {}
+                to_encode = [key for key in keys if key not in reusable]
+                embeddings = np.empty((len(keys), dim), dtype=np.float32) if dim else None
+                if to_encode:
+                    fresh = np.asarray(encode([unique[key]["description"] for key in to_encode]), dtype=np.float32)
+                    if embeddings is None:
+                        dim = fresh.shape[1]
+                        embeddings = np.empty((len(keys), dim), dtype=np.float32)
+                    positions = {key: i for i, key in enumerate(keys)}
+                    embeddings[[positions[key] for key in to_encode]] = fresh
+                if reusable:
+                    positions = [i for i, key in enumerate(keys) if key in reusable]
+                    embeddings[positions] = previous.embeddings[[reusable[keys[i]] for i in positions]]
+                stats["encoded"] += len(to_encode)
+                stats["reused"] += len(reusable)
+
+                descriptions = [unique[key]["description"] for key in keys]
+                skills = skill_extractor.extract_many(descriptions) if skill_extractor is not None else [[]] * len(keys)
+                matrix.write(embeddings.tobytes())
+                db.executemany(
+                    "INSERT INTO jobs (position, key, title, description, skills, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (count + i, key, unique[key]["title"], descriptions[i], json.dumps(skills[i]),
+                         json.dumps(unique[key]["extra"]))
+                        for i, key in enumerate(keys)
+                    ]
+                )
+                db.commit()
+                count += len(keys)
+                if progress is not None:
+                    progress({**stats, "jobs": count, "seconds": round(time.perf_counter() - started, 1)})
+        db.close()
+
+        if count == 0:
+            raise ValueError("No postings with a description were found")
+        with open(os.path.join(build_path, "catalog.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "model": model_name,
+                "dim": dim,
+                "count": count,
+                "taxonomy": taxonomy_key(skill_extractor.taxonomy) if skill_extractor is not None else None,
+                "created": time.time(),
+            }, f)
+        os.replace(build_path, os.path.join(directory, version))
+    except BaseException:
+        db.close()
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+
+    tmp_path = os.path.join(directory, f".{CURRENT}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, CURRENT))
+    _prune(directory, keep_versions)
+
+    seconds = time.perf_counter() - started
+    return {
+        "version": version,
+        "jobs": count,
+        **stats,
+        "seconds": round(seconds, 2),
+        "postings_per_second": round(stats["read"] / seconds, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _prune(directory, keep_versions):
+    # Servers still mapping an old version keep its pages until they switch over
+    versions = sorted(name for name in os.listdir(directory) if name.startswith("v"))
+    for name in versions[:-keep_versions]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream job postings from CSV / JSON Lines into the job catalog")
+    parser.add_argument("sources", nargs="+", help="CSV or JSONL files (optionally .gz), or - for JSONL on stdin")
+    parser.add_argument("--catalog-dir", default=os.environ.get("JOB_CATALOG_DIR", "./job_catalog"))
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from each file's extension")
+    parser.add_argument("--title-field", default="title")
+    parser.add_argument("--description-field", default="description")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="postings encoded and written per step")
+    parser.add_argument("--keep-versions", type=int, default=2)
+    parser.add_argument("--embedder", choices=("model", "stub"), default="model",
+                        help="model: the server's EMBED_BACKEND / EMBED_MODEL_DIR; stub: offline hashed embedder")
+    args = parser.parse_args()
+
+    import app
+    if args.embedder == "stub":
+        from bench import StubEmbedder
+        embedder, model_name = StubEmbedder(), "stub"
+    else:
+        embedder, model_name = app.get_embedder(), app.EMBED_MODEL_ID
+
+    postings = itertools.chain.from_iterable(
+        iter_postings(source, args.title_field, args.description_field, args.format) for source in args.sources
+    )
+    stats = ingest(
+        postings,
+        args.catalog_dir,
+        lambda texts: embedder.encode(texts, batch_size=app.EMBED_BATCH_SIZE, normalize_embeddings=True),
+        model_name,
+        skill_extractor=app.get_skill_extractor(),
+        chunk_size=args.chunk_size,
+        keep_versions=args.keep_versions,
+        progress=lambda p: print(json.dumps(p), file=sys.stderr),
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k_rows(scores, k):
+    # argpartition finds the k best per row in O(n), then only those k get sorted
+    k = min(k, scores.shape[1])
+    if k == scores.shape[1]:
+        ids = np.argsort(-scores, axis=1)
+    else:
+        ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, ids, axis=1), axis=1)
+        ids = np.take_along_axis(ids, order, axis=1)
+    return ids, np.take_along_axis(scores, ids, axis=1)
+
+
+class ExactJobIndex:
+    # Brute-force cosine search: one matmul against every job, exact results
+
+    def __init__(self, embeddings, normalized=False):
+        # Pre-normalized float32 input (e.g. a read-only mmap from JobEmbeddingStore) is used as-is, not copied
+        self.embeddings = embeddings if normalized else normalize(embeddings)
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def similarities(self, queries):
+        # Cosine similarity of every query against every job
+        return normalize(np.atleast_2d(queries)) @ self.embeddings.T
+
+    def search(self, queries, k):
+        return top_k_rows(self.similarities(queries), k)
+
+
+class IVFJobIndex:
+    # Inverted-file index: jobs are bucketed by their nearest k-means centroid and a
+    # query only scores the jobs in its `nprobe` closest buckets. Raising nprobe trades
+    # latency for recall; nprobe == n_lists is an exact search.
+
+    def __init__(self, embeddings, n_lists=None, nprobe=8, n_iter=10, sample_size=50000, seed=0, normalized=False):
+        self.embeddings = embeddings if normalized else normalize(embeddings)
+        n = len(self.embeddings)
+        self.n_lists = max(1, min(n, sample_size, n_lists or int(np.sqrt(n))))
+        self.nprobe = nprobe
+        self.centroids = self._train(n_iter, sample_size, np.random.default_rng(seed))
+
+        assignments = np.argmax(self.embeddings @ self.centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(self.n_lists)]
+
+    def _train(self, n_iter, sample_size, rng):
+        n = len(self.embeddings)
+        sample = self.embeddings[rng.choice(n, min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)]
+        for _ in range(n_iter):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=self.n_lists) == 0
+            # Keep the old centroid for buckets that lost all their points
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+        return centroids
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def search(self, queries, k, nprobe=None):
+        queries = normalize(np.atleast_2d(queries))
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        probes, _ = top_k_rows(queries @ self.centroids.T, nprobe)
+
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, (query, buckets) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([self.lists[c] for c in buckets])
+            if not len(candidates):
+                continue
+            ids, scores = top_k_rows((self.embeddings[candidates] @ query)[None, :], k)
+            all_ids[row, :ids.shape[1]] = candidates[ids[0]]
+            all_scores[row, :ids.shape[1]] = scores[0]
+        return all_ids, all_scores
+
+
+class FaissHNSWJobIndex:
+    # HNSW graph search via faiss (optional dependency). ef_search is the recall/latency knob.
+
+    def __init__(self, embeddings, m=32, ef_construction=200, ef_search=64, normalized=False):
+        if faiss is None:
+            raise ImportError("The 'hnsw' job index backend needs faiss: pip install faiss-cpu")
+        self.embeddings = np.ascontiguousarray(embeddings if normalized else normalize(embeddings), dtype=np.float32)
+        self.index = faiss.IndexHNSWFlat(self.embeddings.shape[1], m, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = ef_construction
+        self.index.hnsw.efSearch = ef_search
+        self.index.add(self.embeddings)
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def search(self, queries, k):
+        scores, ids = self.index.search(normalize(np.atleast_2d(queries)), min(k, len(self)))
+        return ids, scores
+
+
+JOB_INDEX_BACKENDS = {
+    "exact": ExactJobIndex,
+    "ivf": IVFJobIndex,
+    "hnsw": FaissHNSWJobIndex,
+}
+
+
+def build_job_index(embeddings, backend="exact", **options):
+    if backend not in JOB_INDEX_BACKENDS:
+        raise ValueError(f"Unknown job index backend {backend!r}, expected one of {sorted(JOB_INDEX_BACKENDS)}")
+    return JOB_INDEX_BACKENDS[backend](embeddings, **options)
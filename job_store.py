@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def content_key(text, model_name):
+    # The model name is part of the key, so switching models invalidates every row
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class JobEmbeddingStore:
+    # Job embeddings persisted as one .npy matrix plus a manifest of per-row content keys.
+    #
+    # Workers open the matrix with mmap_mode="r", so every process on the host shares the
+    # same page-cache pages instead of holding its own copy. sync() only re-encodes rows
+    # whose description (or model) changed and swaps the new matrix in atomically.
+
+    def __init__(self, directory, model_name):
+        self.directory = directory
+        self.model_name = model_name
+        self.manifest_path = os.path.join(directory, "manifest.json")
+
+    def load(self):
+        # Returns (keys, read-only memory-mapped embeddings), or (None, None) if nothing is stored yet
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            embeddings = np.load(os.path.join(self.directory, manifest["embeddings"]), mmap_mode="r")
+        except (FileNotFoundError, ValueError, KeyError):
+            return None, None
+        if manifest.get("model") != self.model_name or len(manifest["keys"]) != len(embeddings):
+            return None, None
+        return manifest["keys"], embeddings
+
+    def is_current(self, texts):
+        # True when sync(texts, ...) wouldn't need to encode anything
+        stored_keys, _ = self.load()
+        return stored_keys == [content_key(text, self.model_name) for text in texts]
+
+    def sync(self, texts, encode):
+        # Make the store match `texts` row for row; `encode` is only called for new or changed texts
+        keys = [content_key(text, self.model_name) for text in texts]
+        stored_keys, stored = self.load()
+        if stored_keys == keys:
+            return stored
+
+        stored_rows = {key: row for row, key in enumerate(stored_keys or [])}
+        missing = [i for i, key in enumerate(keys) if key not in stored_rows]
+        fresh = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32) if missing else None
+
+        dim = fresh.shape[1] if fresh is not None else stored.shape[1]
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"embeddings-{hashlib.sha256(''.join(keys).encode()).hexdigest()[:16]}.npy"
+        tmp_path = os.path.join(self.directory, f".{filename}.{os.getpid()}.tmp")
+
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(keys), dim))
+        if missing:
+            matrix[missing] = fresh
+        kept = np.array([i for i, key in enumerate(keys) if key in stored_rows], dtype=np.int64)
+        source = np.array([stored_rows[keys[i]] for i in kept], dtype=np.int64)
+        # Copy unchanged rows across in slices so a large catalog never sits in RAM twice
+        for start in range(0, len(kept), 8192):
+            matrix[kept[start:start + 8192]] = stored[source[start:start + 8192]]
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, os.path.join(self.directory, filename))
+
+        previous = self._manifest_embeddings()
+        self._write_manifest({"model": self.model_name, "dim": dim, "keys": keys, "embeddings": filename})
+        # Processes that still have the old matrix mapped keep their pages until they remap
+        if previous and previous != filename:
+            try:
+                os.remove(os.path.join(self.directory, previous))
+            except FileNotFoundError:
+                pass
+
+        return self.load()[1]
+
+    def _manifest_embeddings(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f).get("embeddings")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,129 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import nullcontext
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTERS = {
+    "pdf_pages": "PDF pages sent to text extraction",
+    "pdf_chars": "Characters of text extracted from PDFs",
+    "resumes_parsed": "Resumes run through entity extraction",
+    "skills_found": "Skills found in parsed resumes",
+    "sentences_embedded": "Summaries and chunks encoded by the embedder",
+    "jobs_scored": "Candidate jobs scored for a resume",
+}
+
+_NOOP = nullcontext()
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    # Process-local stage timers, request latencies and counters, rendered in the Prometheus
+    # text format. With enabled=False and tracing=False every call returns straight away and
+    # timer() hands back a shared no-op context manager, so instrumentation costs ~nothing.
+    #
+    # Tracing collects the stage timings of the current request (a context variable, so
+    # concurrent requests don't mix) for a Server-Timing response header.
+
+    def __init__(self, enabled=True, tracing=False, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.tracing = tracing
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}  # (metric, labels) -> [bucket counts..., +Inf count, sum]
+        self._counters = dict.fromkeys(COUNTERS, 0)
+
+    @property
+    def active(self):
+        return self.enabled or self.tracing
+
+    def timer(self, stage):
+        if not (self.enabled or self.tracing):
+            return _NOOP
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        if self.tracing:
+            trace = _trace.get()
+            if trace is not None:
+                trace.append((stage, seconds))
+        if self.enabled:
+            self._observe("resume_stage_duration_seconds", (("stage", stage),), seconds)
+
+    def observe_request(self, endpoint, method, status, seconds):
+        if self.enabled:
+            labels = (("endpoint", endpoint), ("method", method), ("status", str(status)))
+            self._observe("http_request_duration_seconds", labels, seconds)
+
+    def inc(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] += value
+
+    def _observe(self, metric, labels, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get((metric, labels))
+            if histogram is None:
+                histogram = self._histograms[(metric, labels)] = [0] * (len(self.buckets) + 2)
+            histogram[i] += 1
+            histogram[-1] += seconds
+
+    def start_trace(self):
+        return _trace.set([])
+
+    def end_trace(self, token):
+        _trace.reset(token)
+
+    def server_timing(self, total=None):
+        # Server-Timing header value, e.g. `extract;dur=180.2, embed;dur=12.5, total;dur=201.0`
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in _trace.get() or ()]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def render(self):
+        with self._lock:
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for name, value in counters.items():
+            lines += [f"# HELP resume_{name}_total {COUNTERS[name]}", f"# TYPE resume_{name}_total counter",
+                      f"resume_{name}_total {value}"]
+        helps = {
+            "resume_stage_duration_seconds": "Time spent in each resume pipeline stage",
+            "http_request_duration_seconds": "HTTP request latency by endpoint",
+        }
+        for metric, help_text in helps.items():
+            series = sorted((labels, values) for (name, labels), values in histograms.items() if name == metric)
+            if not series:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for labels, values in series:
+                label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+                cumulative = 0
+                for le, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label_text},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{label_text}}} {values[-1]}")
+                lines.append(f"{metric}_count{{{label_text}}} {cumulative}")
+        return "\n".join(lines) + "\n"
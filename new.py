@@ -2,9 +2,14 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 import os
 import io
+import requests
+from backend_client import BackendClient, content_hash
+from embed_service import BatchingEmbedder
+from embedding_backends import load_embedder
+from experience import format_experience
 
 # ✅ This MUST come immediately after imports
 st.set_page_config(
@@ -15,9 +20,76 @@ st.set_page_config(
 
 @st.cache_resource
 def load_embed_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+    # Same backend switch as the Flask app: EMBED_BACKEND=torch|onnx|onnx-int8, EMBED_MODEL_DIR for offline loading
+    return load_embedder(os.environ.get("EMBED_BACKEND", "torch"), os.environ.get("EMBED_MODEL_DIR") or 'all-MiniLM-L6-v2')
 
-model = load_embed_model()
+@st.cache_resource
+def load_batching_embedder():
+    # Shared by every browser session, so concurrent JD matches share one forward pass
+    return BatchingEmbedder(load_embed_model(), max_batch_size=64, max_wait_ms=5)
+
+@st.cache_resource
+def get_backend_client():
+    # One pooled session (keep-alive, timeouts, retries) shared by every browser session; BACKEND_URL picks the server
+    return BackendClient()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def analyze_resume(resume_hash, _data, filename):
+    # Keyed by the content hash only (Streamlit skips hashing `_` arguments), so reruns and
+    # re-uploads of the same PDF never hit the backend again
+    return get_backend_client().analyze_resume(_data, filename)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def rescore_matches(resume_id, semantic_weight, skill_weight, top_k):
+    # Exact re-ranking of every job from the scores the backend cached for this resume
+    return get_backend_client().rescore(resume_id, {"semantic": semantic_weight, "skill": skill_weight}, top_k)["job_matches"]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def match_resume_pool(job_description, top_k=10):
+    # Ranked by the Flask backend against every stored resume; cached so reruns don't re-query
+    return get_backend_client().match_resumes(job_description, top_k)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def experience_timeline_figure(experience, title):
+    # experience: tuple of (title, org, start, end) records as extracted by the backend, with
+    # start/end "YYYY" or "YYYY-MM" and end "present" for ongoing roles; None when no entry is dated
+    timeline = []
+    for role, org, start, end in experience:
+        if not start:
+            continue
+        timeline.append({
+            "Title": f"{role} at {org}" if org else role,
+            "Start": pd.Period(start).start_time,
+            # A year-only end means the role ran through that year
+            "End": pd.Timestamp.now() if end == "present" else pd.Period(end or start).end_time,
+        })
+
+    if not timeline:
+        return None
+    df = pd.DataFrame(timeline)
+    fig = px.timeline(df, x_start="Start", x_end="End", y="Title", color="Title", title=title)
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Position",
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def skill_heatmap_figure(skills):
+    skill_counts = pd.Series(list(skills)).value_counts().reset_index()
+    skill_counts.columns = ["Skill", "Count"]
+
+    fig = px.imshow(
+        skill_counts["Count"].values.reshape(1, -1),
+        labels=dict(x="Skill", y="", color="Count"),
+        x=skill_counts["Skill"],
+        y=["Count"],
+        color_continuous_scale="Viridis"
+    )
+    fig.update_layout(height=150, margin=dict(t=30, b=0))
+    return fig
 
 # --- Multi-language Support --
 lang = st.sidebar.selectbox("🌐 Select Language", ["English", "Spanish"])
@@ -29,6 +101,7 @@ labels = {
         "adjust_weights": "⚖️ Adjust Matching Weights",
         "skills_weight": "Skill Matching Weight",
         "experience_weight": "Experience Matching Weight",
+        "jobs_shown": "Jobs to Show",
         "results": "📊 Results",
         "controls": "⚙️ Controls",
         "skills_header": "🧠 Extracted Skills",
@@ -44,7 +117,11 @@ labels = {
         "no_resume": "📎 Please upload a resume.",
         "paste_jd_info": "✍️ Paste job description to analyze match.",
         "resume_required_for_jd": "⚠️ Please upload a resume first.",
-        "star_rating": "⭐ Match Rating"
+        "star_rating": "⭐ Match Rating",
+        "top_candidates": "🏆 Top Candidates",
+        "no_candidates": "No stored resumes to rank yet.",
+        "backend_unavailable": "⚠️ Backend unavailable, matching against the uploaded resume only.",
+        "analysis_failed": "⚠️ Could not analyze the resume"
     },
     "Spanish": {
         "title": "💼 Emparejador de CV",
@@ -53,6 +130,7 @@ labels = {
         "adjust_weights": "⚖️ Ajustar Pesos de Coincidencia",
         "skills_weight": "Peso de Habilidades",
         "experience_weight": "Peso de Experiencia",
+        "jobs_shown": "Trabajos a Mostrar",
         "results": "📊 Resultados",
         "controls": "⚙️ Controles",
         "skills_header": "🧠 Habilidades Extraídas",
@@ -68,7 +146,11 @@ labels = {
         "no_resume": "📎 Por favor sube un CV.",
         "paste_jd_info": "✍️ Pega la descripción del trabajo para analizar.",
         "resume_required_for_jd": "⚠️ Primero sube un CV.",
-        "star_rating": "⭐ Evaluación de Ajuste"
+        "star_rating": "⭐ Evaluación de Ajuste",
+        "top_candidates": "🏆 Mejores Candidatos",
+        "no_candidates": "Aún no hay CVs guardados para clasificar.",
+        "backend_unavailable": "⚠️ Servidor no disponible, comparando solo con el CV subido.",
+        "analysis_failed": "⚠️ No se pudo analizar el CV"
     }
 }
 L = labels[lang]
@@ -81,6 +163,10 @@ if "resume_data" not in st.session_state:
     st.session_state.resume_data = {}
 if "uploaded_resume" not in st.session_state:
     st.session_state.uploaded_resume = None
+if "resume_hash" not in st.session_state:
+    st.session_state.resume_hash = None
+if "resume_error" not in st.session_state:
+    st.session_state.resume_error = None
 if "mode" not in st.session_state:
     st.session_state.mode = "resume_to_job"
 if "weights" not in st.session_state:
@@ -99,7 +185,6 @@ with left_col:
         uploaded_file = st.file_uploader(L["upload_resume"], type=["pdf"])
         if uploaded_file:
             st.session_state.uploaded_resume = uploaded_file
-            st.session_state.resume_data = {}
     else:
         job_description = st.text_area(L["paste_job"], height=250)
 
@@ -112,43 +197,29 @@ with left_col:
         "skills": skills_w / total,
         "experience": experience_w / total
     }
+    jobs_shown = st.slider(L["jobs_shown"], 1, 10, 3)
 # --- Center Column: Results Display ---
 with center_col:
     st.subheader(L["results"])
 
-    def parse_resume(file):
-        # Simulated parser - replace with actual backend/API if needed
-        return {
-            "extracted_entities": {
-                "skills": ["python", "c++", "sql", "docker", "tensorflow", "pandas"],
-                "experience": [
-                    "AI Engineer at Vaisesika (2019-2022)",
-                    "Intern at Samsung Prism (2018)",
-                    "KPMG Virtual Internship (2020)"
-                ]
-            },
-            "job_matches": [
-                {
-                    "job_title": "AI Engineer", "skill_score": 0.6,
-                    "semantic_score": 0.7, "total_score": 0.65,
-                    "matched_skills": ["python", "tensorflow"]
-                },
-                {
-                    "job_title": "Data Scientist", "skill_score": 0.55,
-                    "semantic_score": 0.6, "total_score": 0.57,
-                    "matched_skills": ["python", "pandas"]
-                },
-                {
-                    "job_title": "Backend Developer", "skill_score": 0.4,
-                    "semantic_score": 0.5, "total_score": 0.45,
-                    "matched_skills": ["docker"]
-                }
-            ]
-        }
-
     if st.session_state.mode == "resume_to_job":
-        if st.session_state.uploaded_resume and not st.session_state.resume_data:
-            st.session_state.resume_data = parse_resume(st.session_state.uploaded_resume)
+        if st.session_state.uploaded_resume:
+            # Only a new file (by content) is uploaded; slider moves go through the cached /rescore call below
+            resume_bytes = st.session_state.uploaded_resume.getvalue()
+            resume_hash = content_hash(resume_bytes)
+            if resume_hash != st.session_state.resume_hash:
+                st.session_state.resume_hash = resume_hash
+                try:
+                    st.session_state.resume_data = analyze_resume(
+                        resume_hash, resume_bytes, st.session_state.uploaded_resume.name
+                    )
+                    st.session_state.resume_error = None
+                except requests.RequestException as e:
+                    # Not retried on every rerun: the next different upload tries the backend again
+                    st.session_state.resume_data = {}
+                    st.session_state.resume_error = str(e)
+            if st.session_state.resume_error:
+                st.error(f"{L['analysis_failed']}: {st.session_state.resume_error}")
 
         data = st.session_state.resume_data
 
@@ -161,40 +232,32 @@ with center_col:
 
             # Experience + Timeline Plot (fixed date parsing)
             with st.expander(L["experience_header"], expanded=True):
-                for exp in data["extracted_entities"]["experience"]:
-                    st.markdown(f"- {exp}")
-
-                timeline = []
-                for item in data["extracted_entities"]["experience"]:
-                    try:
-                        title = item.split(" at ")[0]
-                        years_part = item.split("(")[-1].replace(")", "")
-                        if "-" in years_part:
-                            start_str, end_str = years_part.split("-")
-                            start = int(start_str)
-                            end = int(end_str)
-                        else:
-                            # Single year experience
-                            start = end = int(years_part)
-                        timeline.append({"Title": title, "Start": start, "End": end})
-                    except:
-                        continue
-
-                if timeline:
-                    df = pd.DataFrame(timeline)
-                    fig = px.timeline(df, x_start="Start", x_end="End", y="Title", color="Title",
-                                      title=L["experience_timeline"])
-                    fig.update_yaxes(autorange="reversed")
-                    fig.update_layout(
-                        xaxis_title="Year",
-                        yaxis_title="Position",
-                        margin=dict(l=20, r=20, t=40, b=20)
-                    )
+                experience = data["extracted_entities"]["experience"]
+                for record in experience:
+                    st.markdown(f"- {format_experience(record)}")
+
+                fig = experience_timeline_figure(
+                    tuple((r["title"], r.get("org"), r.get("start"), r.get("end")) for r in experience),
+                    L["experience_timeline"]
+                )
+                if fig is not None:
                     st.plotly_chart(fig, use_container_width=True)
 
             # Job Matches with Star Ratings
             with st.expander(L["job_matches"], expanded=True):
                 matches = data["job_matches"]
+                try:
+                    # The experience slider weighs the semantic score, as in the cards below
+                    matches = rescore_matches(
+                        data["resume_id"],
+                        round(st.session_state.weights["experience"], 4),
+                        round(st.session_state.weights["skills"], 4),
+                        jobs_shown
+                    )
+                except requests.RequestException:
+                    # Backend unreachable or resume expired: re-weight the matches we already have
+                    matches = sorted(matches, key=lambda m: m["skill_score"] * st.session_state.weights["skills"] +
+                                     m["semantic_score"] * st.session_state.weights["experience"], reverse=True)
                 for m in matches:
                     weight = (m["skill_score"] * st.session_state.weights["skills"] +
                               m["semantic_score"] * st.session_state.weights["experience"])
@@ -222,7 +285,7 @@ with center_col:
             # Skill Gap + Learning Resources
             with st.expander(L["skill_gap"], expanded=True):
                 job_skills = set()
-                for m in data["job_matches"]:
+                for m in matches:
                     job_skills.update([s.lower() for s in m["matched_skills"]])
                 resume_skills = set([s.lower() for s in data["extracted_entities"]["skills"]])
                 missing = job_skills - resume_skills
@@ -247,13 +310,46 @@ with center_col:
 
     # Job Description to Resume Match
     else:
-        if not st.session_state.resume_data:
+        ranked = None
+        if job_description:
+            try:
+                ranked = match_resume_pool(job_description)
+            except requests.RequestException:
+                ranked = None
+
+        if ranked is not None:
+            st.markdown(f"**Job Skills:** {', '.join(ranked['job_skills']) if ranked['job_skills'] else 'None'}")
+            with st.expander(L["top_candidates"], expanded=True):
+                if not ranked["candidates"]:
+                    st.info(L["no_candidates"])
+                for c in ranked["candidates"]:
+                    st.markdown(f"""
+                    <div style='
+                        background: linear-gradient(135deg, #e0f7fa 0%, #b2ebf2 100%);
+                        border-left: 8px solid #00796b;
+                        padding: 15px;
+                        margin-bottom: 15px;
+                        border-radius: 10px;
+                        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
+                        color: #004d40;
+                    '>
+                        <h4 style='margin-bottom:5px;'>{c.get('filename') or c['resume_id'][:12]}</h4>
+                        🔹 <b>Total Score:</b> {c['total_score']:.2f}<br>
+                        🔹 <b>Skill Score:</b> {c['skill_score']:.2f}<br>
+                        🔹 <b>Semantic Score:</b> {c['semantic_score']:.2f}<br>
+                        ✅ <b>Skills Matched:</b> <i>{', '.join(c['matched_skills'])}</i>
+                    </div>
+                    """, unsafe_allow_html=True)
+        elif not st.session_state.resume_data:
             st.warning(L["resume_required_for_jd"])
         elif job_description:
-            jd_embed = model.encode(job_description, convert_to_tensor=True)
+            # Backend unreachable: fall back to matching the JD against this session's resume locally
+            st.warning(L["backend_unavailable"])
+            model = load_batching_embedder()
             resume_skills = st.session_state.resume_data.get("extracted_entities", {}).get("skills", [])
-            skill_embeds = model.encode(resume_skills, convert_to_tensor=True)
-            cos_scores = util.cos_sim(jd_embed, skill_embeds)[0]
+            # JD and skills go through the embedder in a single call
+            embeds = model.encode([job_description] + resume_skills, convert_to_tensor=True)
+            cos_scores = util.cos_sim(embeds[0], embeds[1:])[0]
             matches = [(resume_skills[i], cos_scores[i].item()) for i in range(len(resume_skills))]
             matches = sorted(matches, key=lambda x: x[1], reverse=True)
             matched = [s for s, score in matches if score > 0.5]
@@ -267,18 +363,7 @@ with right_col:
     skills = data.get("extracted_entities", {}).get("skills", []) if data else []
 
     if skills:
-        skill_counts = pd.Series(skills).value_counts().reset_index()
-        skill_counts.columns = ["Skill", "Count"]
-
-        fig = px.imshow(
-            skill_counts["Count"].values.reshape(1, -1),
-            labels=dict(x="Skill", y="", color="Count"),
-            x=skill_counts["Skill"],
-            y=["Count"],
-            color_continuous_scale="Viridis"
-        )
-        fig.update_layout(height=150, margin=dict(t=30, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(skill_heatmap_figure(tuple(skills)), use_container_width=True)
     else:
         st.info("No skills data available to display heatmap.")
 
@@ -0,0 +1,125 @@
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import pdfplumber
+
+
+class ExtractionError(Exception):
+    # The upload isn't a readable PDF, or extraction failed or timed out
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _kill_pool(pool):
+    # A task that is already running can't be cancelled: terminate the workers so a hung page
+    # doesn't keep its process busy forever, and let the next call start a fresh pool. Other
+    # documents still in this pool fail with BrokenProcessPool.
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _as_source(source):
+    # Paths and bytes can be shipped to a worker process; file-like objects are read into bytes
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+def _open(source, pages=None):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+    return pdfplumber.open(source, pages=pages)
+
+
+def _collect(pages, max_chars=None):
+    texts = []
+    chars = 0
+    for page in pages:
+        text = page.extract_text()
+        page.close()
+        if text:
+            texts.append(text)
+            chars += len(text)
+            if max_chars is not None and chars >= max_chars:
+                break
+    return texts
+
+
+def _extract_pages(source, page_numbers, max_chars=None):
+    # Runs in a pool worker. No chunk ever needs more than max_chars on its own.
+    with _open(source, pages=page_numbers) as pdf:
+        return _collect(pdf.pages, max_chars)
+
+
+def extract_text(source, max_pages=None, max_chars=None, timeout=None, workers=None, parallel_min_pages=8, stats=None):
+    """Extract the text of a PDF given as a path, bytes or a binary file object.
+
+    Documents with at least `parallel_min_pages` pages are split across a process pool.
+    `max_pages` / `max_chars` stop extraction early, and `timeout` (seconds) bounds the
+    whole document: on expiry ExtractionTimeout is raised and the caller is released.
+    If `stats` is a dict, the number of pages sent to extraction is stored under "pages".
+    Any failure is raised as ExtractionError.
+    """
+    try:
+        return _extract_text(source, max_pages, max_chars, timeout, workers, parallel_min_pages, stats)
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(str(e) or type(e).__name__) from e
+
+
+def _extract_text(source, max_pages, max_chars, timeout, workers, parallel_min_pages, stats):
+    workers = workers or os.cpu_count() or 1
+
+    with _open(source) as pdf:
+        n_pages = len(pdf.pages) if max_pages is None else min(len(pdf.pages), max_pages)
+        if stats is not None:
+            stats["pages"] = n_pages
+        if timeout is None and (workers == 1 or n_pages < parallel_min_pages):
+            return "\n".join(_collect(pdf.pages[:n_pages], max_chars))[:max_chars]
+    if n_pages == 0:
+        return ""
+
+    # With a timeout even small documents go through the pool (as one chunk) so a
+    # pathological page can't hold the calling thread past the deadline
+    source = _as_source(source)
+    n_chunks = min(workers, n_pages) if n_pages >= parallel_min_pages else 1
+    chunk_size = -(-n_pages // n_chunks)
+    page_numbers = list(range(1, n_pages + 1))
+    pool = _get_pool(workers)
+    futures = [
+        pool.submit(_extract_pages, source, page_numbers[start:start + chunk_size], max_chars)
+        for start in range(0, n_pages, chunk_size)
+    ]
+
+    _, pending = wait(futures, timeout=timeout)
+    if pending:
+        _kill_pool(pool)
+        raise ExtractionTimeout(f"PDF text extraction exceeded {timeout}s")
+
+    return "\n".join(text for future in futures for text in future.result())[:max_chars]
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ResumeCache:
+    # Content-addressed cache for parsed resumes: extracted text, entities and embedding.
+    #
+    # Keys are the SHA-256 of the uploaded bytes plus the parser and model versions, so a
+    # parser or model upgrade never serves stale results. A bounded in-memory LRU sits in
+    # front of a disk tier (one .json + one .npz of the array fields per resume) that
+    # survives restarts. Entries not used for `max_age_seconds` are removed and only the
+    # `max_disk_items` most recently used are kept; the directory scan that enforces this runs
+    # after a disk write at most once every `prune_interval` seconds, not on every write.
+
+    def __init__(self, directory, parser_version, model_name, max_items=1024, max_disk_items=None,
+                 max_age_seconds=None, prune_interval=60):
+        self.directory = directory
+        self.parser_version = parser_version
+        self.model_name = model_name
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.max_age_seconds = max_age_seconds
+        self.prune_interval = prune_interval
+        self._pruned_at = float("-inf")
+        self._prune_lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        version = hashlib.sha256(f"{self.parser_version}\0{self.model_name}".encode("utf-8")).hexdigest()[:12]
+        return f"{digest}-{version}"
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        # entry: {"text": str, "summary": str, "entities": dict, "embedding": np.ndarray, ...};
+        # NumPy array fields go to the .npz, everything else to the .json
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def info(self):
+        with self._lock:
+            lookups = sum(self.stats.values())
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "max_items": self.max_items,
+            }
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".npz"
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        json_path, npz_path = self._paths(key)
+        try:
+            with open(json_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            with np.load(npz_path) as arrays:
+                entry.update({name: arrays[name] for name in arrays.files})
+            os.utime(json_path)  # a disk hit counts as fresh for retention
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        return entry
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        json_path, npz_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        arrays = {k: v for k, v in entry.items() if isinstance(v, np.ndarray)}
+        # The .npz goes first and the .json last, so a reader never finds metadata without its arrays
+        with open(npz_path + suffix, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(npz_path + suffix, npz_path)
+        with open(json_path + suffix, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in entry.items() if k not in arrays}, f)
+        os.replace(json_path + suffix, json_path)
+        self._maybe_prune()
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._pruned_at < self.prune_interval:
+            return
+        self._pruned_at = now
+        self.prune()
+
+    def prune(self):
+        # Entries are aged by their .json (written last, touched on every disk hit); the .json
+        # goes first so a concurrent reader misses rather than finding metadata without arrays
+        if not self.directory or (self.max_age_seconds is None and self.max_disk_items is None):
+            return 0
+        with self._prune_lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path[:-len(".json")]))
+                    except FileNotFoundError:
+                        pass
+            entries.sort(reverse=True)
+
+            expired = []
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                expired = [base for mtime, base in entries if mtime < cutoff]
+                entries = [(mtime, base) for mtime, base in entries if mtime >= cutoff]
+            if self.max_disk_items is not None:
+                expired += [base for _, base in entries[self.max_disk_items:]]
+
+            for base in expired:
+                for path in (base + ".json", base + ".npz"):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass  # another worker pruned it first
+        return len(expired)
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+
+import numpy as np
+from scipy.sparse import vstack
+
+from job_index import top_k_rows
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no flock. Appends are still serialized within the process; gunicorn (the
+    # multi-process server) doesn't run there, but don't run batch_score.py against the same
+    # RESUME_INDEX_DIR while the server is adding resumes.
+    fcntl = None
+
+
+class ResumeIndex:
+    # Pool of parsed resumes for reverse (job description -> resumes) matching.
+    #
+    # Persisted as two append-only files: embeddings.f32 (raw float32 rows) and
+    # resumes.jsonl (one metadata record per row, same order). Appends from any process
+    # happen under an exclusive flock, and every search first picks up rows other
+    # processes have appended since, so all workers see the same pool without reloading.
+    # Skill vectors are kept in memory as a sparse resume x skill matrix.
+
+    def __init__(self, directory, skill_extractor, dim):
+        self.directory = directory
+        self.skill_extractor = skill_extractor
+        self.dim = dim
+        self.embeddings_path = os.path.join(directory, "embeddings.f32")
+        self.meta_path = os.path.join(directory, "resumes.jsonl")
+        self.lock_path = os.path.join(directory, ".lock")
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._meta_offset = 0
+        self.records = []
+        self.rows = {}
+        self.embeddings = np.zeros((0, dim), dtype=np.float32)
+        self.skill_matrix = skill_extractor.skill_matrix([])
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, resume_id, embedding, skills, **meta):
+        # Re-adding a resume id that is already in the pool is a no-op
+        return self.add_many([(resume_id, embedding, skills, meta)]) == 1
+
+    def add_many(self, items):
+        # items: (resume_id, embedding, skills, meta) tuples, appended under one lock with one
+        # write per file; ids already in the pool (or repeated in items) are skipped.
+        # Returns the number of resumes added.
+        with self._lock, open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            new = {}
+            for resume_id, embedding, skills, meta in items:
+                if resume_id not in self.rows and resume_id not in new:
+                    new[resume_id] = (np.asarray(embedding, dtype=np.float32).reshape(self.dim), skills, meta)
+            if not new:
+                return 0
+            self._truncate_partial_writes()
+            with open(self.embeddings_path, "ab") as f:
+                f.write(np.stack([embedding for embedding, _, _ in new.values()]).tobytes())
+            with open(self.meta_path, "a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps({"resume_id": resume_id, "skills": skills, **meta}) + "\n"
+                    for resume_id, (_, skills, meta) in new.items()
+                ))
+            self._refresh()
+        return len(new)
+
+    def _truncate_partial_writes(self):
+        # Row N of embeddings.f32 belongs to line N of resumes.jsonl. A writer that crashed
+        # between its two appends leaves an extra embedding row (or a partial metadata line);
+        # cut both files back to the complete records before appending, under the flock.
+        if os.path.exists(self.embeddings_path):
+            size = len(self.records) * self.dim * 4
+            if os.path.getsize(self.embeddings_path) > size:
+                os.truncate(self.embeddings_path, size)
+        if os.path.exists(self.meta_path) and os.path.getsize(self.meta_path) > self._meta_offset:
+            os.truncate(self.meta_path, self._meta_offset)
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        # Read only what was appended since the last refresh
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                f.seek(self._meta_offset)
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        # A record is complete only once its trailing newline has been written
+        if lines and not lines[-1].endswith("\n"):
+            lines.pop()
+        if not lines:
+            return
+        self._meta_offset += sum(len(line.encode("utf-8")) for line in lines)
+
+        new_records = [json.loads(line) for line in lines]
+        for record in new_records:
+            self.rows[record["resume_id"]] = len(self.records)
+            self.records.append(record)
+
+        # Memory-mapped, so the pool's vectors live in the shared page cache, not per worker
+        self.embeddings = np.memmap(self.embeddings_path, dtype=np.float32, mode="r", shape=(len(self.records), self.dim))
+        self.skill_matrix = vstack(
+            [self.skill_matrix, self.skill_extractor.skill_matrix([r["skills"] for r in new_records])], format="csr"
+        )
+
+    def search(self, query_embedding, query_skills, top_k=10, weights=(0.6, 0.4)):
+        # Rank every resume against one job description: same 0.6/0.4 semantic/skill blend
+        # as job matching, with skill score = share of the JD's skills the resume has
+        self.refresh()
+        with self._lock:
+            if not self.records:
+                return []
+            embeddings, skill_matrix, records = self.embeddings, self.skill_matrix, self.records
+
+        query_vector = self.skill_extractor.skill_vector(query_skills)
+        semantic_scores = embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        skill_scores = (skill_matrix @ query_vector) / max(len(query_skills), 1)
+        total_scores = weights[0] * semantic_scores + weights[1] * skill_scores
+
+        top, _ = top_k_rows(total_scores[None, :], top_k)
+        query_set = set(query_skills)
+        return [
+            {
+                **records[i],
+                "semantic_score": round(float(semantic_scores[i]), 2),
+                "skill_score": round(float(skill_scores[i]), 2),
+                "total_score": round(float(total_scores[i]), 2),
+                "matched_skills": [s for s in records[i]["skills"] if s in query_set],
+            }
+            for i in top[0]
+        ]
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ScoreCache:
+    # Per-resume semantic and skill score vectors over the job catalog, so /rescore can
+    # re-rank with new weights without touching the models.
+    #
+    # Bounded LRU in memory: at most `max_items` resumes, each dropped `ttl` seconds after it
+    # was stored. Score vectors are kept as float32, the precision the upload ranked with, so
+    # a rescore with the same weights returns exactly the upload's ranking.
+
+    def __init__(self, max_items=256, ttl=3600):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, entry = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, entry):
+        # entry: {"version", "job_ids", "semantic", "skill", "skills"} as built by app.job_score_vectors
+        entry = dict(entry, semantic=np.asarray(entry["semantic"], dtype=np.float32),
+                     skill=np.asarray(entry["skill"], dtype=np.float32))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "items": len(self._entries), "max_items": self.max_items, "ttl": self.ttl}
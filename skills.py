@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from spacy.matcher import PhraseMatcher
+from spacy.util import compile_infix_regex, filter_spans
+
+
+# Canonical skill -> synonyms. A taxonomy file (JSON with the same shape) can replace this.
+DEFAULT_SKILLS_TAXONOMY = {
+    "python": [],
+    "c++": ["cpp"],
+    "c": [],
+    # Listed so "C#" (tokenized as "c" + "#") matches as a longer span than "c"
+    "c#": ["csharp", "c sharp"],
+    "sql": [],
+    "java": [],
+    "opencv": [],
+    "tensorflow": [],
+    "rasa": [],
+    "docker": [],
+    "matplotlib": [],
+    "pandas": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "gen ai": ["generative ai", "genai"],
+    "data science": [],
+    "nlp": ["natural language processing"],
+    "communication": [],
+    "leadership": [],
+    "team work": ["teamwork"],
+}
+
+
+def load_taxonomy(path):
+    # JSON: {"canonical skill": ["synonym", ...], ...}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SkillExtractor:
+    # Every skill name and synonym is compiled once into a spaCy PhraseMatcher over
+    # lower-cased tokens, so a whole document is scanned in one pass and matches only
+    # land on token boundaries ("c" no longer matches inside "scikit" or "docker").
+    # Only the tokenizer runs; the rest of the pipeline is skipped. The tokenizer of `nlp` is
+    # changed to also split on "/" and "|", so skill lists like "C++/Python" or "Python|SQL"
+    # match each skill; pass a pipeline used only for skills.
+
+    def __init__(self, nlp, taxonomy=None):
+        nlp.tokenizer.infix_finditer = compile_infix_regex(list(nlp.Defaults.infixes) + [r"[/|]"]).finditer
+        self.nlp = nlp
+        self.taxonomy = taxonomy or DEFAULT_SKILLS_TAXONOMY
+        self.skills = list(self.taxonomy)
+        self._order = {skill: i for i, skill in enumerate(self.skills)}
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for skill, synonyms in self.taxonomy.items():
+            patterns = [nlp.make_doc(name) for name in dict.fromkeys([skill, *synonyms])]
+            self.matcher.add(skill, patterns)
+
+    def _skills_in(self, doc):
+        # Overlapping matches keep the longest span, so "c++" wins over "c"
+        found = {span.label_ for span in filter_spans(self.matcher(doc, as_spans=True))}
+        return sorted(found, key=self._order.__getitem__)
+
+    def extract(self, text):
+        # Canonical skills found in `text`, in taxonomy order
+        return self._skills_in(self.nlp.make_doc(text))
+
+    def extract_many(self, texts, batch_size=256):
+        return [self._skills_in(doc) for doc in self.nlp.tokenizer.pipe(texts, batch_size=batch_size)]
+
+    def skill_matrix(self, skill_lists):
+        # Sparse (documents x taxonomy) 0/1 incidence matrix, one row per skill list
+        indptr = [0]
+        indices = []
+        for found in skill_lists:
+            indices.extend(self._order[skill] for skill in found if skill in self._order)
+            indptr.append(len(indices))
+        return csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(skill_lists), len(self.skills))
+        )
+
+    def skill_vector(self, skills):
+        # Dense 0/1 vector over the taxonomy; `matrix @ vector` gives each row's skill overlap
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        vector[[self._order[skill] for skill in skills if skill in self._order]] = 1.0
+        return vector
@@ -0,0 +1,213 @@
+import json
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _BaseTaskQueue:
+    # Shared by both queues: `concurrency` worker threads run `handler(*args)` per task,
+    # submit() raises QueueFull once `max_pending` tasks are waiting, and finished tasks
+    # are kept for `result_ttl` seconds. Task status: queued -> running -> done | error.
+
+    poll_interval = 1.0
+
+    def __init__(self, handler, concurrency=4, max_pending=64, result_ttl=3600):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._cond = threading.Condition()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(concurrency)]
+
+    def _start(self):
+        for worker in self._workers:
+            worker.start()
+
+    def wait(self, task_id, status, timeout):
+        # Block until the task leaves `status` (or timeout); returns the task as in get()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                task = self.get(task_id)
+                remaining = deadline - time.monotonic()
+                if task is None or task["status"] != status or remaining <= 0:
+                    return task
+                self._cond.wait(min(remaining, self.poll_interval))
+
+    def _run(self, task_id, args):
+        try:
+            result = self.handler(*args)
+        except Exception as e:
+            self._finish(task_id, "error", error=str(e))
+        else:
+            self._finish(task_id, "done", result=result)
+
+
+class TaskQueue(_BaseTaskQueue):
+    # In-process queue: nothing survives a restart, nothing to set up
+
+    def __init__(self, handler, concurrency=4, max_pending=64, result_ttl=3600):
+        super().__init__(handler, concurrency, max_pending, result_ttl)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._tasks = {}
+        self._start()
+
+    def submit(self, *args):
+        task_id = uuid.uuid4().hex
+        with self._cond:
+            self._expire()
+            self._tasks[task_id] = {"status": "queued", "updated": time.time()}
+        try:
+            self._queue.put_nowait((task_id, args))
+        except queue.Full:
+            with self._cond:
+                del self._tasks[task_id]
+            raise QueueFull(f"{self.max_pending} uploads already waiting")
+        return task_id
+
+    def get(self, task_id):
+        with self._cond:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            task_id, args = self._queue.get()
+            self._update(task_id, status="running")
+            self._run(task_id, args)
+
+    def _finish(self, task_id, status, **fields):
+        self._update(task_id, status=status, **fields)
+
+    def _update(self, task_id, **fields):
+        with self._cond:
+            self._tasks[task_id].update(fields, updated=time.time())
+            self._cond.notify_all()
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        for task_id in [k for k, t in self._tasks.items() if t["status"] in ("done", "error") and t["updated"] < cutoff]:
+            del self._tasks[task_id]
+
+
+class SQLiteTaskQueue(_BaseTaskQueue):
+    # Durable queue in a SQLite file. Several processes can share one database: whichever
+    # worker claims a task runs it, and a task left "running" for `stale_after` seconds
+    # (its process died) is picked up again.
+
+    poll_interval = 0.2
+
+    def __init__(self, handler, path, concurrency=4, max_pending=64, result_ttl=3600, stale_after=600):
+        super().__init__(handler, concurrency, max_pending, result_ttl)
+        self.path = path
+        self.stale_after = stale_after
+        self._local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload BLOB,
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created);
+        """)
+        self._start()
+
+    def _db(self):
+        # One connection per thread; autocommit mode with explicit BEGIN IMMEDIATE for writes
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def submit(self, *args):
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "DELETE FROM tasks WHERE status IN ('done', 'error') AND updated < ?",
+                (now - self.result_ttl,)
+            )
+            (waiting,) = db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'queued'").fetchone()
+            if waiting >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} uploads already waiting")
+            db.execute(
+                "INSERT INTO tasks (id, status, payload, created, updated) VALUES (?, 'queued', ?, ?, ?)",
+                (task_id, pickle.dumps(args), now, now)
+            )
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        with self._cond:
+            self._cond.notify_all()
+        return task_id
+
+    def get(self, task_id):
+        row = self._db().execute(
+            "SELECT status, result, error, updated FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, result, error, updated = row
+        task = {"status": status, "updated": updated}
+        if result is not None:
+            task["result"] = json.loads(result)
+        if error is not None:
+            task["error"] = error
+        return task
+
+    def pending(self):
+        return self._db().execute("SELECT COUNT(*) FROM tasks WHERE status = 'queued'").fetchone()[0]
+
+    def _claim(self):
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT id, payload FROM tasks WHERE status = 'queued' OR (status = 'running' AND updated < ?) "
+                "ORDER BY created LIMIT 1",
+                (now - self.stale_after,)
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE tasks SET status = 'running', updated = ? WHERE id = ?", (now, row[0]))
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return row
+
+    def _work(self):
+        while True:
+            row = self._claim()
+            if row is None:
+                with self._cond:
+                    self._cond.wait(self.poll_interval)
+                continue
+            task_id, payload = row
+            self._run(task_id, pickle.loads(payload))
+
+    def _finish(self, task_id, status, result=None, error=None):
+        self._db().execute(
+            "UPDATE tasks SET status = ?, result = ?, error = ?, payload = NULL, updated = ? WHERE id = ?",
+            (status, None if result is None else json.dumps(result), error, time.time(), task_id)
+        )
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import threading
+import time
+
+
+class UploadStore:
+    # Optional on-disk archive of uploaded resumes.
+    #
+    # Files are named by the SHA-256 of their bytes, so concurrent uploads never clobber
+    # each other and a resubmitted resume is stored once. Files older than `max_age_seconds`
+    # are removed and only the newest `max_files` are kept; the directory scan that enforces
+    # this runs after a save at most once every `prune_interval` seconds.
+
+    def __init__(self, directory, max_age_seconds=None, max_files=None, prune_interval=60):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_files = max_files
+        self.prune_interval = prune_interval
+        self._pruned_at = float("-inf")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, data, suffix=".pdf"):
+        path = os.path.join(self.directory, hashlib.sha256(data).hexdigest() + suffix)
+        if os.path.exists(path):
+            os.utime(path)  # a resubmission counts as fresh for retention
+        else:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._maybe_prune()
+        return path
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._pruned_at < self.prune_interval:
+            return
+        self._pruned_at = now
+        self.prune()
+
+    def prune(self):
+        if self.max_age_seconds is None and self.max_files is None:
+            return 0
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass
+            files.sort(reverse=True)
+
+            expired = []
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                expired = [path for mtime, path in files if mtime < cutoff]
+                files = [(mtime, path) for mtime, path in files if mtime >= cutoff]
+            if self.max_files is not None:
+                expired += [path for _, path in files[self.max_files:]]
+
+            for path in expired:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+        return len(expired)